@@ -0,0 +1,91 @@
+'''
+* Adaptive step size controller. Picks the longest time step that keeps the
+integration error and the overlap of any collision within a tolerance.
+* NOTE:
+    - Only 1D motion is supported. Particles are sorted by position, so each
+    particle can only reach its right neighbour or a wall first.
+    - Friction only slows particles down, so a particle moves at most
+    |v| * dt during a step with every computational method.
+    - A step never goes past the next sample time, so the output is still
+    written every delta_t.
+'''
+
+import numpy as np
+
+import kinematics
+from state import State
+from system import System
+
+class AdaptiveStep:
+    def __init__(self, state: State, system: System, length: float, tolerance: float):
+
+        assert tolerance > 0, "Tolerance must be positive"
+
+        self.state = state
+        self.system = system
+        self.length = length
+        self.tolerance = tolerance
+        self.steps = 0
+
+    def __repr__(self):
+        return f"AdaptiveStep({self.state.n}, tolerance = {self.tolerance}, steps = {self.steps})"
+
+    def __call__(self, limit: float):
+        '''
+        * Size of the next time step, at most limit.
+        '''
+        self.steps += 1
+        return min(limit, self.contact(), self.integration())
+
+    def contact(self):
+        '''
+        * Longest step after which no pair or wall overlaps by more than the
+        tolerance.
+        '''
+        return contact_time(self.state, self.length, self.tolerance)
+
+    def integration(self):
+        '''
+        * Longest step whose position error from friction is within the
+        tolerance.
+        * NOTE:
+            - Under a constant deceleration a, one step of euler-cromer is off
+            by a * dt^2 / 2. Midpoint and verlet are exact until a particle
+            stops within the step, where the error has the same bound.
+        '''
+        acceleration = self.system.acceleration
+        moving = self.state.vx != 0
+        if acceleration <= 0 or not moving.any():
+            return np.inf
+
+        step = np.sqrt(2 * self.tolerance / acceleration)
+        if self.system.computation.method == "euler-cromer":
+            return float(step)
+
+        stop = kinematics.stop_time(self.state.vx[moving], acceleration)
+        return float(max(step, np.min(stop)))
+
+def contact_time(state: State, length: float, tolerance: float = 0.0):
+    '''
+    * Earliest time any neighbour pair or a particle and a wall can overlap by
+    more than tolerance. Infinite if nothing is approaching.
+    * NOTE:
+        - A pair that is gap apart and closing at speed v cannot touch for
+        gap / v seconds. With a tolerance, the step ends just after they touch,
+        so they overlap by at most the tolerance, which is still enough for the
+        collision to be detected.
+    '''
+    order = np.argsort(state.x, kind = "stable")
+    x, vx, size = state.x[order], state.vx[order], state.length[order]
+
+    # Every neighbour pair, then the left and the right wall.
+    gap = np.concatenate([x[1:] - x[:-1] - size[:-1], x[:1],
+                          length - x[-1:] - size[-1:]])
+    closing = np.concatenate([vx[:-1] - vx[1:], -1 * vx[:1], vx[-1:]])
+
+    approaching = closing > 0
+    if not approaching.any():
+        return np.inf
+
+    gap, closing = gap[approaching], closing[approaching]
+    return float(np.min((np.maximum(gap, 0) + tolerance) / closing))
@@ -0,0 +1,60 @@
+'''
+* Analytic fast-forward. Between collisions every particle moves with constant
+velocity or a constant friction deceleration, so it can be moved to any later
+time in closed form instead of step by step.
+* NOTE:
+    - Only 1D motion is supported, like the adaptive engine it falls back to.
+    - The horizon is a lower bound on the time of the next contact, computed
+    from the current speeds. Friction only slows particles down, so nothing can
+    touch before it.
+'''
+
+import numpy as np
+
+import kinematics
+from adaptive import contact_time
+from state import State
+from system import System
+
+class FastForward:
+    def __init__(self, state: State, system: System, length: float):
+
+        self.state = state
+        self.system = system
+        self.length = length
+        self.jumps = 0
+
+    def __repr__(self):
+        return f"FastForward({self.state.n}, jumps = {self.jumps})"
+
+    def horizon(self):
+        '''
+        * Time until the next possible contact. Infinite if nothing is
+        approaching another particle or a wall.
+        '''
+        return contact_time(self.state, self.length)
+
+    def __call__(self, times: np.ndarray):
+        '''
+        * Move every particle to each of times, measured from now, at once.
+        Returns positions, velocities, total friction work and total impulse
+        with one row per time. The state is left at the last time.
+        '''
+        state, system = self.state, self.system
+        times = np.asarray(times, dtype = float)
+
+        x, vx = kinematics.advance(state.x, state.vx, system.acceleration, times[:, None])
+
+        # Friction removes the kinetic energy and momentum that was lost.
+        dissipated = system.dissipated + 0.5 * (state.vx ** 2 - vx ** 2) @ state.mass
+        impulse = system.impulse + (vx - state.vx) @ state.mass
+
+        ke = state.ke().sum()
+        state.x[:] = x[-1]
+        state.vx[:] = vx[-1]
+        system.ke = state.ke().sum() - ke
+        system.dissipated = float(dissipated[-1])
+        system.impulse = float(impulse[-1])
+
+        self.jumps += 1
+        return x, vx, dissipated, impulse
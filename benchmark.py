@@ -0,0 +1,220 @@
+'''
+* Benchmarks for the stepping, collision and output hot paths.
+* Usage: python benchmark.py --particles 100 1000 10000 --output benchmark.json
+  --baseline baseline.json --tolerance 0.2
+* NOTE:
+    - Results are written as JSON, one record per case. If a baseline is given,
+    every case that is slower than the baseline by more than the tolerance is
+    reported and the program exits with status 1.
+'''
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from output import FIELDS, open_writer
+from simulation import Simulation
+from particle import Particle
+
+def configuration(n_particles: int, density: float, friction: float, method: str,
+                  seed: int = 0):
+    '''
+    * Simulation and system info of n unit particles covering a fraction
+    density of the length, with random velocities.
+    '''
+    rng = np.random.default_rng(seed)
+    length = int(np.ceil(n_particles / density))
+
+    # Spread the free space randomly between the particles so none overlap.
+    gaps = rng.dirichlet(np.ones(n_particles + 1)) * (length - n_particles)
+    x = np.cumsum(gaps[:-1]) + np.arange(n_particles)
+    vx = rng.uniform(-10, 10, n_particles)
+
+    simulation_info = {
+        "output": "",
+        "mode": "1D",
+        "particles": [Particle(1, 1, 1, x[i], 0, vx[i], 0) for i in range(n_particles)],
+        "n_particles": n_particles,
+        "length": length,
+        "width": 5,
+        "max_vx": 0,
+        "max_vy": 0,
+        "max_t": np.inf,
+        "delta_t": 1e-3
+    }
+    system_info = {
+        "system_type": "elastic",
+        "kinetic_friction": friction,
+        "computational_method": method
+    }
+
+    return simulation_info, system_info
+
+def measure(function, min_time: float, max_calls: int = 10 ** 6):
+    '''
+    * Call function until min_time seconds have passed. Returns the number of
+    calls and the total time.
+    '''
+    function()
+
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while elapsed < min_time and calls < max_calls:
+        function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+
+    return calls, elapsed
+
+def stepping(simulation: Simulation, min_time: float):
+    return measure(simulation._Simulation__step, min_time)
+
+def collision(simulation: Simulation, min_time: float):
+    return measure(simulation._Simulation__collision, min_time)
+
+def wall(simulation: Simulation, min_time: float):
+    state, system = simulation.state, simulation.system
+    return measure(lambda: system.walls(state, simulation.length, simulation.width), min_time)
+
+def writing(simulation: Simulation, min_time: float, extension: str, steps: int = 100):
+    '''
+    * Time writing recorded rows to an output file and waiting until they are
+    on disk, the way a run streams its trajectory.
+    '''
+    for _ in range(steps):
+        simulation._Simulation__step()
+
+    trajectory = simulation.trajectory
+    rows = [trajectory.rows(name) for name in FIELDS["1D"]]
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer = open_writer(os.path.join(directory, "benchmark" + extension), 
+                             simulation.state.n)
+
+        def write():
+            writer.write(trajectory.steps, *rows)
+            writer.sync()
+
+        result = measure(write, min_time, max_calls = 100)
+        writer.close()
+
+    return result
+
+def csv(simulation: Simulation, min_time: float):
+    return writing(simulation, min_time, ".csv")
+
+def npy(simulation: Simulation, min_time: float):
+    return writing(simulation, min_time, ".npy")
+
+CASES = {"step": stepping, "collision": collision, "wall": wall, "csv": csv, "npy": npy}
+
+def benchmark(particles: list, methods: list, densities: list, frictions: list,
+              cases: list, min_time: float):
+    '''
+    * Time every case for every combination of parameters.
+    '''
+    results = []
+
+    for n, method, density, friction, case in itertools.product(
+            particles, methods, densities, frictions, cases):
+        simulation_info, system_info = configuration(n, density, friction, method)
+        # Only the output cases need the trajectory, the others keep memory flat.
+        recording = {} if case in ["csv", "npy"] else {"final": True}
+        simulation = Simulation(**simulation_info, system_info = system_info,
+                                recording = recording)
+
+        calls, seconds = CASES[case](simulation, min_time)
+        result = {
+            "case": case,
+            "particles": n,
+            "method": method,
+            "density": density,
+            "friction": friction,
+            "calls": calls,
+            "seconds": seconds,
+            "calls_per_second": calls / seconds,
+            "particle_calls_per_second": n * calls / seconds
+        }
+        results.append(result)
+        print(f"{case:>9} n={n:<7} {method:<12} density={density:<5} " +
+              f"friction={friction:<5} {result['calls_per_second']:>12.1f}/s " +
+              f"{result['particle_calls_per_second']:>14.1f} particles/s")
+
+    return results
+
+def key(result: dict):
+    return (result["case"], result["particles"], result["method"],
+            result["density"], result["friction"])
+
+def compare(results: list, baseline: list, tolerance: float):
+    '''
+    * Cases whose throughput dropped by more than tolerance compared to the
+    baseline. Cases missing from the baseline are skipped.
+    '''
+    reference = {key(result): result for result in baseline}
+    regressions = []
+
+    for result in results:
+        if key(result) not in reference:
+            continue
+
+        ratio = result["calls_per_second"] / reference[key(result)]["calls_per_second"]
+        if ratio < 1 - tolerance:
+            regressions.append((result, ratio))
+            print(f"Regression: {key(result)} runs at {ratio:.2f}x the baseline")
+
+    return regressions
+
+def arguments():
+    '''
+    * Command line arguments.
+    '''
+    parser = argparse.ArgumentParser(
+        prog = "Benchmark",
+        description = "Time the stepping, collision and output hot paths"
+    )
+
+    parser.add_argument("--particles", nargs = "+", type = int, default = [100, 1000, 10000])
+    parser.add_argument("--method", nargs = "+", default = ["euler-cromer", "midpoint", "verlet"],
+                        choices = ["euler-cromer", "midpoint", "verlet"])
+    parser.add_argument("--density", nargs = "+", type = float, default = [0.1, 0.5],
+                        help = "Fraction of the length covered by particles")
+    parser.add_argument("--friction", nargs = "+", type = float, default = [0.0, 0.3])
+    parser.add_argument("--case", nargs = "+", default = list(CASES.keys()),
+                        choices = list(CASES.keys()))
+    parser.add_argument("--min-time", type = float, default = 0.5,
+                        help = "Minimum seconds spent timing each case")
+    parser.add_argument("--output", type = str, default = "benchmark.json",
+                        help = "Name of the results file")
+    parser.add_argument("--baseline", type = str, default = None,
+                        help = "Results file to compare against")
+    parser.add_argument("--tolerance", type = float, default = 0.2,
+                        help = "Allowed relative slowdown compared to the baseline")
+
+    return parser.parse_args()
+
+def main():
+    parser = arguments()
+    results = benchmark(parser.particles, parser.method, parser.density,
+                        parser.friction, parser.case, parser.min_time)
+
+    with open(parser.output, "w") as file:
+        json.dump({"python": platform.python_version(), "numpy": np.__version__,
+                   "results": results}, file, indent = 2)
+
+    if parser.baseline is not None:
+        with open(parser.baseline) as file:
+            baseline = json.load(file)["results"]
+        if compare(results, baseline, parser.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+'''
+* Broad phase collision detection. Finds every pair of overlapping particles.
+* NOTE:
+    - Pairs are returned as two arrays (i, j) with i < j, ordered the same way
+    as itertools.combinations so collisions are resolved in a stable order.
+    - SortAndSweep suits 1D, where particles stay in order. SpatialHash suits
+    dense 2D gases, where sweeping along x alone finds too many candidates.
+'''
+
+import itertools
+
+import numpy as np
+
+from state import State
+
+class BruteForce:
+    '''
+    * Check every pair of particles. O(n^2) per step, kept as a reference.
+    '''
+
+    def __call__(self, state: State):
+        pairs = [(i, j) for i, j in itertools.combinations(range(state.n), 2)
+                 if state.overlap(i, j)]
+
+        if len(pairs) == 0:
+            return np.empty(0, dtype = int), np.empty(0, dtype = int)
+
+        i, j = np.asarray(pairs).T
+        return i, j
+
+class SortAndSweep:
+    '''
+    * Keep particles sorted by their left edge and only test each particle
+    against the neighbours that start before its right edge ends.
+    * NOTE:
+        - The order is kept between calls. Particles rarely pass each other
+        within one time step, so re-sorting a nearly sorted order is O(n).
+    '''
+
+    def __init__(self):
+        self.order = None
+
+    def __repr__(self):
+        return "SortAndSweep()"
+
+    def __call__(self, state: State):
+        self.__sort(state.x)
+
+        x = state.x[self.order]
+        right = x + state.length[self.order]
+
+        i, j = [], []
+        candidate = np.arange(state.n - 1)
+        offset = 1
+
+        while candidate.size > 0:
+            # A particle that misses its k-th neighbour misses every later one.
+            candidate = candidate[x[candidate + offset] < right[candidate]]
+            i.append(self.order[candidate])
+            j.append(self.order[candidate + offset])
+
+            offset += 1
+            candidate = candidate[candidate + offset < state.n]
+
+        i = np.concatenate(i) if i else np.empty(0, dtype = int)
+        j = np.concatenate(j) if j else np.empty(0, dtype = int)
+
+        if state.mode == "2D":
+            i, j = overlapping(state, i, j)
+
+        return ordered(i, j)
+
+    def __sort(self, x: np.ndarray):
+        '''
+        * Update the order of particles by position.
+        '''
+        if self.order is None or len(self.order) != len(x):
+            self.order = np.argsort(x, kind = "stable")
+            return
+
+        position = x[self.order]
+        if np.any(position[1:] < position[:-1]):
+            self.order = self.order[np.argsort(position, kind = "stable")]
+
+class SpatialHash:
+    '''
+    * Uniform grid of square cells at least as large as the largest particle.
+    Each particle is put in the cell of its lower left corner, so it can only
+    overlap particles of the same or a neighbouring cell.
+    * NOTE:
+        - Every cell is checked against itself and 4 of its 8 neighbours, so
+        each pair of cells is visited once. Finding candidates is O(n) for a
+        bounded number of particles per cell.
+    '''
+    NEIGHBOURS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+    def __init__(self, cell: float = None):
+
+        assert cell is None or cell > 0, "Cell must have size"
+        self.cell = cell
+
+    def __repr__(self):
+        return f"SpatialHash({self.cell})"
+
+    def __call__(self, state: State):
+        cell = self.cell
+        if cell is None:
+            cell = max(state.length.max(), state.width.max())
+
+        column = np.floor(state.x / cell).astype(int)
+        row = np.floor(state.y / cell).astype(int)
+        # Pad the rows so a neighbour of the top or bottom row never wraps.
+        column -= column.min()
+        row -= row.min() - 1
+        rows = row.max() + 2
+
+        key = column * rows + row
+        order = np.argsort(key, kind = "stable")
+        key = key[order]
+
+        i, j = [], []
+        for d_column, d_row in self.NEIGHBOURS:
+            target = key + d_column * rows + d_row
+            if d_column == 0 and d_row == 0:
+                # Only the particles after this one in its own cell.
+                start = np.arange(1, state.n + 1)
+            else:
+                start = np.searchsorted(key, target, side = "left")
+            end = np.searchsorted(key, target, side = "right")
+
+            count = np.maximum(end - start, 0)
+            first = np.repeat(np.arange(state.n), count)
+            second = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count) + \
+                np.repeat(start, count)
+            i.append(order[first])
+            j.append(order[second])
+
+        return ordered(*overlapping(state, np.concatenate(i), np.concatenate(j)))
+
+def overlapping(state: State, i: np.ndarray, j: np.ndarray):
+    '''
+    * Keep the candidate pairs whose rectangles overlap along both axes.
+    '''
+    overlap = (state.x[i] < state.x[j] + state.length[j]) & \
+        (state.x[j] < state.x[i] + state.length[i]) & \
+        (state.y[i] < state.y[j] + state.width[j]) & \
+        (state.y[j] < state.y[i] + state.width[i])
+    return i[overlap], j[overlap]
+
+def ordered(i: np.ndarray, j: np.ndarray):
+    '''
+    * Pairs with i < j, sorted by i and then j.
+    '''
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    pairs = np.lexsort((j, i))
+    return i[pairs], j[pairs]
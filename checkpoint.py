@@ -0,0 +1,48 @@
+'''
+* Checkpoints. A snapshot of everything a simulation needs to continue a run,
+stored as one .npz file of named arrays.
+* NOTE:
+    - The file is written next to the output, e.g. 'output.csv' is
+    checkpointed to 'output.checkpoint.npz'.
+    - A new checkpoint is written to a temporary file first and then renamed,
+    so a run that dies while saving still leaves the previous checkpoint.
+'''
+
+import json
+import os
+
+import numpy as np
+
+def checkpoint_path(filename: str):
+    '''
+    * Name of the checkpoint of an output file.
+    '''
+    return os.path.splitext(filename)[0] + ".checkpoint.npz"
+
+def save(filename: str, arrays: dict):
+    '''
+    * Write the arrays to filename, replacing any earlier checkpoint at once.
+    '''
+    temporary = filename + ".tmp"
+    with open(temporary, "wb") as file:
+        np.savez(file, **arrays)
+    os.replace(temporary, filename)
+
+def load(filename: str):
+    '''
+    * Read every array of a checkpoint.
+    '''
+    with np.load(filename) as data:
+        return {name: data[name] for name in data.files}
+
+def random_state(rng: np.random.Generator):
+    '''
+    * State of a random generator as an array holding its JSON description.
+    '''
+    return {"random": np.array(json.dumps(rng.bit_generator.state))}
+
+def set_random_state(rng: np.random.Generator, arrays: dict):
+    '''
+    * Restore a random generator from random_state().
+    '''
+    rng.bit_generator.state = json.loads(str(arrays["random"]))
@@ -0,0 +1,73 @@
+'''
+* Computational methods for approximating velocity and displacement.
+* NOTE:
+    - Every method advances all particles of a state at once, along one axis
+    at a time.
+'''
+
+import numpy as np
+
+from state import State
+
+class Computation:
+
+    METHODS = ["euler-cromer", "midpoint", "verlet"]
+
+    def __init__(self, computational_method: str):
+
+        assert computational_method in self.METHODS, \
+            f"Computational method must be one of {self.METHODS}"
+
+        self.method = computational_method
+        self.__step = {
+            "euler-cromer": self.__euler_cromer,
+            "midpoint": self.__midpoint,
+            "verlet": self.__verlet
+        }[computational_method]
+
+    def __repr__(self):
+        return f"Computation({self.method})"
+
+    def __call__(self, delta_t: float, state: State, acceleration: np.ndarray,
+                 axis: str = "x"):
+        '''
+        * Advance every particle by one time step.
+        * Parameters:
+            - state: Positions and velocities of every particle.
+            - acceleration: Acceleration of each particle along the axis.
+            - delta_t: Time step.
+            - axis: "x" or "y".
+        '''
+        self.__step(delta_t, getattr(state, axis), getattr(state, "v" + axis), acceleration)
+        return state
+
+    def __euler_cromer(self, delta_t: float, position: np.ndarray, velocity: np.ndarray,
+                       acceleration: np.ndarray):
+        '''
+        * Approximate the particles' velocity and displacement using Euler's
+        algorithm.
+        '''
+
+        velocity += acceleration * delta_t
+        position += velocity * delta_t
+
+    def __midpoint(self, delta_t: float, position: np.ndarray, velocity: np.ndarray,
+                   acceleration: np.ndarray):
+        '''
+        * Approximate the particles' velocity and displacement using midpoint
+        algorithm.
+        '''
+
+        initial = velocity.copy()
+        velocity += acceleration * delta_t
+        position += 0.5 * (initial + velocity) * delta_t
+
+    def __verlet(self, delta_t: float, position: np.ndarray, velocity: np.ndarray,
+                 acceleration: np.ndarray):
+        '''
+        * Approximate the particles' velocity and displacement using Verlet
+        algorithm. This is a mathematical equivalent of leap-frog algorithm.
+        '''
+
+        position += velocity * delta_t + 0.5 * acceleration * delta_t ** 2
+        velocity += 0.5 * (acceleration + acceleration) * delta_t
@@ -0,0 +1,186 @@
+'''
+* Conservation diagnostics. Tracks kinetic energy, momentum and the energy
+dissipated by friction as time series, and reports how far they drift.
+* NOTE:
+    - Energy balance: KE + work done by friction should equal the initial KE.
+    - Momentum balance: momentum - impulse from friction and walls should equal
+    the initial momentum. Only particle-particle collisions remain, and they
+    should conserve it.
+    - Drift is relative to the initial KE and to the initial sum of |m * vx|,
+    so it is defined even when the initial momentum is zero.
+    - The series follows the same recording policy as the trajectory (every,
+    last or final) and is stored in a Recording, as the trajectory is. The
+    latest totals and the largest drift are kept for every step, so drift()
+    and report() cover the whole run whatever is recorded.
+    - A checkpoint only holds that running state, so its size does not grow
+    with the length of the run.
+'''
+
+import numpy as np
+
+from recording import Recording
+from state import State
+from system import System
+
+class Conservation:
+    SERIES = ["time", "ke", "momentum", "dissipated", "impulse"]
+    BLOCK = 4096 # most samples in one block
+
+    def __init__(self, state: State, system: System, every: int = 1, last: int = None,
+                 final: bool = False):
+
+        assert every >= 1, "Must record at least every step"
+        assert last is None or last >= 1, "Must keep at least 1 step"
+
+        self.state = state
+        self.system = system
+        self.every = every
+        self.last = last
+        self.final = final
+
+        self.ke0 = float(state.ke().sum())
+        self.momentum0 = float(np.sum(state.mass * state.vx))
+        self.scale = float(np.sum(state.mass * np.abs(state.vx)))
+
+        self.recording = Recording({"row": ((len(self.SERIES),), float)}, self.BLOCK, last)
+        self.totals = {}
+        self.max_energy = 0.0
+        self.max_momentum = 0.0
+
+        self.record(0.0)
+
+    def __repr__(self):
+        return f"Conservation({self.system.computation.method}, samples = {len(self)})"
+
+    def __len__(self):
+        if self.final:
+            return 1
+        return len(self.recording)
+
+    def record(self, time: float):
+        '''
+        * Update the totals and drift with the current step, and save them if
+        the step is recorded.
+        '''
+        row = [time, float(self.state.ke().sum()),
+               float(np.dot(self.state.mass, self.state.vx)),
+               float(self.system.dissipated), float(self.system.impulse)]
+        self.__update(np.array([self.state.step]), np.array([row]))
+
+    def record_rows(self, times: np.ndarray, steps: np.ndarray, vx: np.ndarray,
+                    dissipated: np.ndarray, impulse: np.ndarray):
+        '''
+        * Update and save the totals of several steps at once, one row of
+        velocities per step. Only the velocities along the x-axis may change.
+        '''
+        ke = 0.5 * (vx ** 2 + self.state.vy ** 2) @ self.state.mass
+        self.__update(steps, np.column_stack([times, ke, vx @ self.state.mass,
+                                              dissipated, impulse]))
+
+    def snapshot(self):
+        '''
+        * Running state needed to continue after a restart: the initial totals,
+        the latest totals and the largest drift. The kept series is included
+        only with the last policy, where its size is bounded.
+        '''
+        snapshot = {
+            "initial": np.array([self.ke0, self.momentum0, self.scale]),
+            "totals": np.array([self.totals[name] for name in self.SERIES]),
+            "max": np.array([self.max_energy, self.max_momentum]),
+            "rows": np.empty((0, len(self.SERIES)))
+        }
+        if self.last is not None:
+            snapshot["rows"] = self.recording.ordered("row")
+        return snapshot
+
+    def restore(self, snapshot: dict):
+        '''
+        * Continue from snapshot(). With the every policy, the series starts
+        again after the restart.
+        '''
+        self.ke0, self.momentum0, self.scale = snapshot["initial"].tolist()
+        self.totals = dict(zip(self.SERIES, snapshot["totals"].tolist()))
+        self.max_energy, self.max_momentum = snapshot["max"].tolist()
+
+        self.recording.clear()
+        if self.last is not None:
+            self.recording.append({"row": snapshot["rows"]})
+
+    def series(self):
+        '''
+        * Every recorded quantity as arrays. With the final policy, only the
+        latest totals.
+        '''
+        if self.final:
+            return {name: np.array([self.totals[name]]) for name in self.SERIES}
+
+        rows = self.recording.ordered("row")
+        return {name: rows[:, column] for column, name in enumerate(self.SERIES)}
+
+    @property
+    def time(self):
+        return self.series()["time"]
+
+    @property
+    def ke(self):
+        return self.series()["ke"]
+
+    @property
+    def momentum(self):
+        return self.series()["momentum"]
+
+    @property
+    def dissipated(self):
+        return self.series()["dissipated"]
+
+    @property
+    def impulse(self):
+        return self.series()["impulse"]
+
+    def drift(self):
+        '''
+        * Relative drift of energy and momentum at the latest step, and the
+        largest drift over the run.
+        '''
+        energy, momentum = self.__drift(np.array([[self.totals[name] for name in self.SERIES]]))
+
+        return {
+            "energy": float(energy[-1]),
+            "momentum": float(momentum[-1]),
+            "max_energy": self.max_energy,
+            "max_momentum": self.max_momentum
+        }
+
+    def report(self):
+        '''
+        * Summary of the drift for printing at the end of a run.
+        '''
+        drift = self.drift()
+        return f"Method: {self.system.computation.method}, " + \
+            f"KE: {self.totals['ke']:.6g}J, dissipated: {self.totals['dissipated']:.6g}J, " + \
+            f"energy drift: {drift['energy']:.3e} (max {drift['max_energy']:.3e}), " + \
+            f"momentum drift: {drift['momentum']:.3e} (max {drift['max_momentum']:.3e})"
+
+    def __update(self, steps: np.ndarray, rows: np.ndarray):
+        '''
+        * Keep the latest totals and the largest drift, then save the rows of
+        the recorded steps.
+        '''
+        energy, momentum = self.__drift(rows)
+        self.max_energy = max(self.max_energy, float(np.max(np.abs(energy))))
+        self.max_momentum = max(self.max_momentum, float(np.max(np.abs(momentum))))
+        self.totals = dict(zip(self.SERIES, rows[-1].tolist()))
+
+        if not self.final:
+            self.recording.append({"row": rows[steps % self.every == 0]})
+
+    def __drift(self, rows: np.ndarray):
+        '''
+        * Relative drift of energy and momentum of each row of totals.
+        '''
+        energy = rows[:, 1] + rows[:, 3] - self.ke0
+        momentum = rows[:, 2] - rows[:, 4] - self.momentum0
+
+        energy = energy / self.ke0 if self.ke0 > 0 else energy
+        momentum = momentum / self.scale if self.scale > 0 else momentum
+        return energy, momentum
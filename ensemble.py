@@ -0,0 +1,174 @@
+'''
+* Ensembles. Many replicas of the same scenario, e.g. with perturbed initial
+velocities, advanced together as one state instead of one Simulation each.
+* NOTE:
+    - Replica r holds particles r * n to (r + 1) * n - 1 of one flat State,
+    so the system integrates, bounces and collides every replica in the same
+    array operations. The x, vx, y and vy properties are (replicas, n) views.
+    - Replicas share the space of the simulation. For the broad phase, each
+    replica is shifted along x by its own stride, so particles of different
+    replicas never overlap and never collide.
+    - Only the step engine is supported.
+'''
+
+import numpy as np
+
+from broadphase import SortAndSweep, SpatialHash
+from output import FIELDS
+from state import State
+from system import System
+
+class Ensemble:
+    def __init__(self, states: list, length: float, width: float, max_t: float,
+                 delta_t: float, system_info: dict, mode: str = "1D", every: int = 1):
+
+        assert len(states) > 0, "Ensemble must have at least 1 replica"
+        assert all(state.n == states[0].n for state in states), \
+            "Every replica must have the same number of particles"
+        assert delta_t > 0, "Time step cannot be zero or negative"
+        assert every >= 1, "Must record at least every step"
+
+        self.replicas = len(states)
+        self.n = states[0].n
+        self.mode = mode
+        self.length = length
+        self.width = width
+        self.time = 0
+        self.max_t = max_t
+        self.delta_t = delta_t
+        self.every = every
+
+        self.state = stack(states, mode)
+        self.system = System(self.state, **system_info, mode = mode)
+        self.broad_phase = SortAndSweep() if mode == "1D" else SpatialHash()
+
+        # Positions seen by the broad phase, sharing every other array with the state.
+        self.__shifted = State(self.state.n, mode)
+        for name in ["y", "mass", "length", "width"]:
+            setattr(self.__shifted, name, getattr(self.state, name))
+        stride = length + self.state.length.max()
+        self.__offset = np.repeat(np.arange(self.replicas) * stride, self.n)
+
+        self.times = []
+        self.samples = {name: [] for name in FIELDS[mode] + ["ke", "momentum"]}
+        self.__record()
+
+    def __repr__(self):
+        return f"Ensemble({self.replicas} x {self.n}, {self.mode}, step = {self.state.step})"
+
+    def __len__(self):
+        return self.replicas
+
+    @property
+    def x(self):
+        return self.state.x.reshape(self.replicas, self.n)
+
+    @property
+    def vx(self):
+        return self.state.vx.reshape(self.replicas, self.n)
+
+    @property
+    def y(self):
+        return self.state.y.reshape(self.replicas, self.n)
+
+    @property
+    def vy(self):
+        return self.state.vy.reshape(self.replicas, self.n)
+
+    def ke(self):
+        '''
+        * Kinetic energy of each replica.
+        '''
+        return self.state.ke().reshape(self.replicas, self.n).sum(axis = 1)
+
+    def momentum(self):
+        '''
+        * Momentum along the x-axis of each replica.
+        '''
+        return (self.state.mass * self.state.vx).reshape(self.replicas, self.n).sum(axis = 1)
+
+    def run(self):
+        '''
+        * Advance every replica to max_t.
+        '''
+        while self.time < self.max_t:
+            self.__step()
+
+        return self
+
+    def results(self):
+        '''
+        * Recorded samples of every replica: times, and for each field, energy
+        and momentum an array with the replica first and the sample second.
+        '''
+        results = {"time": np.asarray(self.times)}
+        for name, samples in self.samples.items():
+            results[name] = np.stack(samples, axis = 1)
+        return results
+
+    def summary(self):
+        '''
+        * Mean, standard deviation, minimum and maximum over the replicas of
+        the kinetic energy and momentum at every sample.
+        '''
+        results = self.results()
+        summary = {"time": results["time"]}
+
+        for name in ["ke", "momentum"]:
+            for statistic in ["mean", "std", "min", "max"]:
+                summary[f"{name}_{statistic}"] = getattr(np, statistic)(results[name], axis = 0)
+
+        return summary
+
+    def __step(self):
+        '''
+        * Advance every replica by one time step delta_t.
+        '''
+        self.system(self.delta_t, self.state)
+        self.system.walls(self.state, self.length, self.width)
+
+        np.add(self.state.x, self.__offset, out = self.__shifted.x)
+        self.system.collisions(self.state, *self.broad_phase(self.__shifted))
+
+        self.time += self.delta_t
+        self.state.step += 1
+        if self.state.step % self.every == 0:
+            self.__record()
+
+    def __record(self):
+        '''
+        * Save a copy of every field and the energy and momentum of each replica.
+        '''
+        self.times.append(self.time)
+        for name in FIELDS[self.mode]:
+            self.samples[name].append(getattr(self, name).copy())
+
+        self.samples["ke"].append(self.ke())
+        self.samples["momentum"].append(self.momentum())
+
+def stack(states: list, mode: str = "1D"):
+    '''
+    * One state holding the particles of every state in turn.
+    '''
+    stacked = State(sum(state.n for state in states), mode)
+
+    for name in ["x", "vx", "y", "vy", "mass", "length", "width"]:
+        setattr(stacked, name, np.concatenate([getattr(state, name) for state in states]))
+
+    return stacked
+
+def perturb(state: State, replicas: int, rng: np.random.Generator, scale: float):
+    '''
+    * Copies of a state whose velocities are moved by normal noise of
+    standard deviation scale. Velocities along y only change in 2D.
+    '''
+    states = []
+
+    for _ in range(replicas):
+        copy = stack([state], state.mode)
+        copy.vx += rng.normal(0, scale, state.n)
+        if state.mode == "2D":
+            copy.vy += rng.normal(0, scale, state.n)
+        states.append(copy)
+
+    return states
@@ -0,0 +1,212 @@
+'''
+* Event driven engine. Predicts when particles hit each other or the walls and
+jumps directly from one impact to the next.
+* NOTE:
+    - Only 1D motion is supported. Particles never pass each other, so each
+    particle can only hit its left and right neighbour or a wall.
+    - Particles are advanced lazily. Each one keeps the time, position and
+    velocity of its last impact, and its motion since then has a closed form.
+'''
+
+import heapq
+import math
+
+import numpy as np
+
+import kinematics
+from state import State
+from system import System
+
+LEFT_WALL = -1
+RIGHT_WALL = -2
+
+class EventEngine:
+    def __init__(self, state: State, system: System, length: float):
+
+        self.state = state
+        self.system = system
+        self.length = length
+        self.time = 0.0
+
+        self.t0 = np.zeros(state.n)
+        self.x0 = state.x.copy()
+        self.v0 = state.vx.copy()
+
+        self.order = np.argsort(state.x, kind = "stable")
+        self.rank = np.empty(state.n, dtype = int)
+        self.rank[self.order] = np.arange(state.n)
+
+        # Incremented on every impact, so predictions made before are stale.
+        self.count = np.zeros(state.n, dtype = int)
+        self.events = []
+        self.__sequence = 0
+        self.n_events = 0
+
+        # Friction work and impulse of every free flight that ended in an impact. 
+        self.dissipated = 0.0
+        self.impulse = 0.0
+
+        for particle in range(state.n):
+            self.__predict(particle)
+
+    def __repr__(self):
+        return f"EventEngine({self.state.n}, time = {self.time}, events = {self.n_events})"
+
+    def advance(self, time: float):
+        '''
+        * Process every impact up to time and update the state to that time.
+        '''
+        while self.events and self.events[0][0] <= time:
+            t, _, i, j, count_i, count_j = heapq.heappop(self.events)
+
+            if self.count[i] != count_i or (j >= 0 and self.count[j] != count_j):
+                continue
+
+            self.__impact(t, i, j)
+
+        ke = self.state.ke().sum()
+        x, vx = kinematics.advance(self.x0, self.v0, self.system.acceleration, time - self.t0)
+        self.state.x[:] = x
+        self.state.vx[:] = vx
+        self.system.ke = self.state.ke().sum() - ke
+        self.time = time
+
+        # Add the part of the current free flights that already happened. 
+        mass = self.state.mass
+        self.system.dissipated = self.dissipated + np.sum(0.5 * mass * (self.v0 ** 2 - vx ** 2))
+        self.system.impulse = self.impulse + np.sum(mass * (vx - self.v0))
+
+        return self.state
+
+    def __impact(self, time: float, i: int, j: int):
+        '''
+        * Move the particles involved to the time of impact and bounce them.
+        '''
+        self.time = time
+        involved = [i] if j < 0 else [i, j]
+
+        for particle in involved:
+            x, v = self.__at(particle, time)
+            mass = self.state.mass[particle]
+            self.dissipated += 0.5 * mass * (self.v0[particle] ** 2 - v ** 2)
+            self.impulse += mass * (v - self.v0[particle])
+
+            self.t0[particle], self.x0[particle], self.v0[particle] = time, x, v
+            self.count[particle] += 1
+
+        if j < 0:
+            self.impulse += -2 * self.state.mass[i] * self.v0[i]
+            self.v0[i] = -1 * self.v0[i]
+        else:
+            self.state.vx[i], self.state.vx[j] = self.v0[i], self.v0[j]
+            self.system.momentum(self.state, i, j)
+            self.v0[i], self.v0[j] = self.state.vx[i], self.state.vx[j]
+
+        self.n_events += 1
+        for particle in involved:
+            self.__predict(particle)
+
+    def __at(self, particle: int, time: float):
+        '''
+        * Position and velocity of one particle at a given time.
+        '''
+        x, v = kinematics.advance(self.x0[particle], self.v0[particle],
+                                  self.system.acceleration, time - self.t0[particle])
+        return float(x), float(v)
+
+    def __predict(self, particle: int):
+        '''
+        * Schedule the next impact of a particle with each of its neighbours.
+        '''
+        if self.system.system_type != "elastic":
+            return
+
+        rank = self.rank[particle]
+        left = self.order[rank - 1] if rank > 0 else LEFT_WALL
+        right = self.order[rank + 1] if rank < self.state.n - 1 else RIGHT_WALL
+
+        for i, j in [(left, particle), (particle, right)]:
+            t = self.__contact(i, j)
+            if t is None:
+                continue
+
+            if i == LEFT_WALL:
+                i, j = j, LEFT_WALL
+            count_j = self.count[j] if j >= 0 else 0
+            heapq.heappush(self.events, (t, self.__sequence, i, j, self.count[i], count_j))
+            self.__sequence += 1
+
+    def __body(self, particle: int):
+        '''
+        * Position, velocity, stop time and size of a particle at the current
+        time. Walls are bodies that never move.
+        '''
+        if particle == LEFT_WALL:
+            return 0.0, 0.0, 0.0, 0.0
+        if particle == RIGHT_WALL:
+            return float(self.length), 0.0, 0.0, 0.0
+
+        x, v = self.__at(particle, self.time)
+        stop = float(kinematics.stop_time(v, self.system.acceleration))
+        return x, v, stop, float(self.state.length[particle])
+
+    def __contact(self, left: int, right: int):
+        '''
+        * Earliest time the right edge of left touches the left edge of right
+        while they are approaching. None if they never touch.
+        * NOTE:
+            - The gap between them is piecewise quadratic. A new piece starts
+            whenever one of them comes to rest.
+        '''
+        x_l, v_l, stop_l, length_l = self.__body(left)
+        x_r, v_r, stop_r, _ = self.__body(right)
+
+        a_l = -1 * math.copysign(self.system.acceleration, v_l) if v_l != 0 else 0.0
+        a_r = -1 * math.copysign(self.system.acceleration, v_r) if v_r != 0 else 0.0
+
+        start = 0.0
+        for end in sorted([stop_l, stop_r, math.inf]):
+            if end <= start:
+                continue
+
+            gap = x_r - x_l - length_l
+            closing = v_r - v_l
+            tau = first_root(gap, closing, 0.5 * (a_r - a_l), end - start)
+            if tau is not None:
+                return self.time + start + tau
+
+            # Move both bodies to the end of this piece.
+            duration = end - start
+            if math.isinf(duration):
+                return None
+            x_l += v_l * duration + 0.5 * a_l * duration ** 2
+            x_r += v_r * duration + 0.5 * a_r * duration ** 2
+            v_l += a_l * duration; v_r += a_r * duration
+            if end >= stop_l: v_l, a_l = 0.0, 0.0
+            if end >= stop_r: v_r, a_r = 0.0, 0.0
+            start = end
+
+        return None
+
+def first_root(c: float, b: float, a: float, limit: float):
+    '''
+    * Smallest t in [0, limit] where c + b * t + a * t^2 reaches zero while
+    decreasing. None if there is no such t.
+    '''
+    if c <= 0 and b < 0:
+        return 0.0
+
+    if a == 0:
+        roots = [-c / b] if b < 0 else []
+    else:
+        discriminant = b ** 2 - 4 * a * c
+        if discriminant < 0:
+            return None
+        root = math.sqrt(discriminant)
+        roots = sorted([(-b - root) / (2 * a), (-b + root) / (2 * a)])
+
+    for t in roots:
+        if 0 <= t <= limit and b + 2 * a * t < 0:
+            return t
+
+    return None
@@ -0,0 +1,93 @@
+'''
+* Random initial states. Every quantity is drawn for all particles at once, so
+millions of particles can be placed in one pass.
+* NOTE:
+    - A distribution is either a number (every particle gets that value), a
+    (low, high) pair (uniform between them), or a function of a random
+    Generator and the number of particles that returns the values.
+    - In 1D the free length is split randomly between the particles, so they
+    never overlap and any number of particles fits as long as their total
+    length does.
+    - In 2D each particle is put at a random spot inside its own cell of a
+    grid, and no two particles share a cell.
+'''
+
+import numpy as np
+
+from state import State
+
+DEFAULTS = {"length": 1, "width": 1, "mass": 1}
+
+def sample(rng: np.random.Generator, distribution, n_particles: int):
+    '''
+    * Draw n values from a distribution.
+    '''
+    if callable(distribution):
+        values = np.asarray(distribution(rng, n_particles), dtype = float)
+    elif np.ndim(distribution) == 0:
+        values = np.full(n_particles, float(distribution))
+    else:
+        low, high = distribution
+        values = rng.uniform(low, high, n_particles)
+
+    assert values.shape == (n_particles,), "Distribution must give one value per particle"
+    return values
+
+def random_state(n_particles: int, length: float, width: float, mode: str,
+                 rng: np.random.Generator, max_vx: float, max_vy: float,
+                 distributions: dict = None):
+    '''
+    * State of n particles with random sizes, masses, positions and velocities
+    inside a box of length by width.
+    * Parameters:
+        - distributions: Distribution of "length", "width", "mass", "vx" and
+        "vy". Sizes and masses default to 1, velocities to uniform between
+        -max and max.
+    '''
+    distributions = {} if distributions is None else distributions
+    distributions = {**DEFAULTS, "vx": (-max_vx, max_vx), "vy": (-max_vy, max_vy),
+                     **distributions}
+
+    state = State(n_particles, mode)
+    for name in ["length", "width", "mass", "vx"]:
+        getattr(state, name)[:] = sample(rng, distributions[name], n_particles)
+
+    assert np.all(state.length > 0) and np.all(state.width > 0), "Particle must have size"
+    assert np.all(state.mass > 0), "Particle must have mass"
+
+    if mode == "2D":
+        state.vy[:] = sample(rng, distributions["vy"], n_particles)
+        state.x[:], state.y[:] = cells(rng, state.length, state.width, length, width)
+    else:
+        state.x[:] = spread(rng, state.length, length)
+
+    return state
+
+def spread(rng: np.random.Generator, sizes: np.ndarray, length: float):
+    '''
+    * Positions of particles side by side along the x-axis, with the free
+    length split uniformly at random between the gaps.
+    '''
+    free = length - sizes.sum()
+    assert free >= 0, "Particles are longer than the simulation"
+
+    # The sorted uniform points are where the free length before each particle ends.
+    gaps = np.sort(rng.uniform(0, free, len(sizes)))
+    return gaps + np.cumsum(sizes) - sizes
+
+def cells(rng: np.random.Generator, lengths: np.ndarray, widths: np.ndarray,
+          length: float, width: float):
+    '''
+    * Positions of particles in distinct cells of a grid as large as the
+    largest particle.
+    '''
+    cell_length, cell_width = lengths.max(), widths.max()
+    columns, rows = int(length // cell_length), int(width // cell_width)
+    assert columns * rows >= len(lengths), "Not enough space for every particle"
+
+    cell = rng.choice(columns * rows, size = len(lengths), replace = False)
+    row, column = np.divmod(cell, columns)
+
+    x = column * cell_length + rng.uniform(0, 1, len(lengths)) * (cell_length - lengths)
+    y = row * cell_width + rng.uniform(0, 1, len(widths)) * (cell_width - widths)
+    return x, y
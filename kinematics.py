@@ -0,0 +1,28 @@
+'''
+* Closed form motion of particles decelerated by kinetic friction.
+* NOTE:
+    - A particle moving with speed v under a friction deceleration a comes to
+    rest after |v| / a seconds and stays there.
+'''
+
+import numpy as np
+
+def stop_time(velocity, deceleration: float):
+    '''
+    * Time until friction brings each particle to rest. Infinite without
+    friction.
+    '''
+    speed = np.abs(velocity)
+    if deceleration <= 0:
+        return np.full_like(speed, np.inf, dtype = float)
+    return speed / deceleration
+
+def advance(x, velocity, deceleration: float, t):
+    '''
+    * Position and velocity of each particle after moving freely for t seconds.
+    '''
+    tau = np.minimum(t, stop_time(velocity, deceleration))
+    acceleration = -1 * np.sign(velocity) * deceleration
+
+    return x + velocity * tau + 0.5 * acceleration * tau ** 2, \
+           velocity + acceleration * tau
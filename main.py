@@ -1,14 +1,15 @@
 '''
 * Main driver for the simulation
-* Usage: python main.py input --output --p --length --dt --time --friction --method
+* Usage: python main.py input --output --p --mode --length --width --dt --time --friction --method
+  --engine --tolerance --headless --record-every --record-last --record-final --checkpoint --resume
 '''
 
 from simulation import * 
+from output import output_path 
 
 import argparse 
 import sys 
 import os 
-import pathlib 
 
 def sample():
     #Sample simulation info 
@@ -22,7 +23,9 @@ def sample():
         "max_vx": 10, 
         "max_vy": 5,
         "max_t": 30,
-        "delta_t": 1e-2
+        "delta_t": 1e-2,
+        "engine": "step",
+        "seed": 1
     }
 
     #Sample sytstem info 
@@ -38,12 +41,12 @@ def assert_output(output: str):
     '''
     * Error checking if output file already existed 
     '''
-    files = [str(file).split("\\")[-1] for file in pathlib.Path(os.getcwd()).glob("*.csv")]
-    if not output + ".csv" in files:
+    filename = output_path(output)
+    if not os.path.exists(filename):
         return output 
 
    
-    print(f"{output + '.csv'} existed. Type 'yes' to change filename, 'no' to proceed: ", 
+    print(f"{filename} existed. Type 'yes' to change filename, 'no' to proceed: ", 
           end = "")
 
     while True:
@@ -61,8 +64,8 @@ def assert_output(output: str):
         print("Please enter a new filename: ", end = "")
         output = input()
     else:
-        print(f"Current {output + '.csv'} in directory will be deleted")
-        os.remove(output + ".csv")
+        print(f"Current {filename} in directory will be deleted")
+        os.remove(filename)
 
     return assert_output(output) 
 
@@ -88,12 +91,17 @@ def arguments():
     "Enter '0' for random initialization and '1' for command line arguments"
 
     required = sys.argv[1] == '1'
-    parser.add_argument("--output", type = str, help = "Name of output file")
+    parser.add_argument("--output", type = str, 
+                        help = "Name of output file. '.npy' writes a binary trajectory, otherwise CSV")
     parser.add_argument("-p", "--particles", nargs = "+", type = int, action = "append",
                         help = "Configuration: length, width, mass, x, y, vx, vy",
                         required = required)
+    parser.add_argument("--mode", type = str, default = "1D", choices = ["1D", "2D"], 
+                        help = "Move and collide particles along x only, or along x and y")
     parser.add_argument("--length", type = int, required = required, 
                         help = "The boundary of the simulation")
+    parser.add_argument("--width", type = int, default = 5, 
+                        help = "The boundary of the simulation in the y direction")
     parser.add_argument("--dt", type = float, help = "Simulation time step", 
                         required = required)
     parser.add_argument("--time", required = required, 
@@ -105,30 +113,71 @@ def arguments():
     parser.add_argument("--method", type = str, required = required, 
                         choices = ["euler-cromer", "midpoint", "verlet"])
 
+    #Engine info
+    parser.add_argument("--engine", type = str, default = "step", 
+                        choices = ["step", "event", "adaptive", "analytic"],
+                        help = """'step' advances by fixed time steps, 'event' jumps 
+                                between predicted impacts and samples every --dt, 
+                                'adaptive' picks each time step from --tolerance and 
+                                samples every --dt, 'analytic' moves particles in closed 
+                                form until the next possible contact and steps adaptively 
+                                through it""")
+    parser.add_argument("--tolerance", type = float, default = 1e-3, 
+                        help = "Largest overlap or position error per step of the adaptive and analytic engines")
+    parser.add_argument("--headless", action = "store_true", 
+                        help = "Run to the end without animation and write the output")
+
+    #Animation info 
+    parser.add_argument("--fps", type = float, default = 30, 
+                        help = "Most frames shown per second by the animation")
+    parser.add_argument("--steps-per-frame", type = int, default = None, 
+                        help = "Time steps per frame, by default enough to play in real time")
+
+    #Recording info 
+    parser.add_argument("--record-every", type = int, default = 1, 
+                        help = "Record every k-th time step")
+    parser.add_argument("--record-last", type = int, default = None, 
+                        help = "Only keep the last N recorded time steps")
+    parser.add_argument("--record-final", action = "store_true", 
+                        help = "Only record the final state")
+
+    #Checkpoint info 
+    parser.add_argument("--checkpoint", type = int, default = None, 
+                        help = "Save a checkpoint next to the output every N time steps")
+    parser.add_argument("--resume", action = "store_true", 
+                        help = "Continue an interrupted run from its latest checkpoint")
+
     return parser.parse_args()
 
 def parse_argument(parser: argparse):
     '''
     * Parse command line argument.
-    * TODO: Edit if modelling 2D.
     '''
 
     if parser.input == 0:
         return sample()
     
-    filename = "" if parser.output is None else assert_output(parser.output)
+    filename = "" if parser.output is None else parser.output 
+    if filename != "" and not parser.resume:
+        filename = assert_output(filename)
 
     simulation_info = {
         "output": filename,
-        "mode": "1D", 
+        "mode": parser.mode, 
         "particles": [], 
         "n_particles": len(parser.particles), 
         "length": parser.length,
-        "width": 5, 
+        "width": parser.width, 
         "max_vx": 0, 
         "max_vy": 0, 
         "max_t": parser.time, 
-        "delta_t": parser.dt}
+        "delta_t": parser.dt,
+        "engine": parser.engine,
+        "tolerance": parser.tolerance,
+        "recording": {"every": parser.record_every, "last": parser.record_last, 
+                      "final": parser.record_final},
+        "checkpoint": parser.checkpoint, 
+        "resume": parser.resume}
 
     for configuration in parser.particles:
         simulation_info["particles"].append(Particle(*configuration))
@@ -144,7 +193,12 @@ def main():
     parser = arguments()
     simulation_info, system_info = parse_argument(parser)
     simulation = Simulation(**simulation_info, system_info = system_info)
-    simulation.animation()
+
+    if parser.headless:
+        simulation.run()
+        print(simulation.conservation.report())
+    else:
+        simulation.animation(parser.steps_per_frame, parser.fps)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,358 @@
+'''
+* Output sinks that write recorded samples while the simulation runs, and a
+reader for binary trajectories.
+* NOTE:
+    - Rows are buffered into fixed size chunks. Each full chunk is handed to a
+    background thread, so formatting and disk I/O overlap with the simulation.
+    - The format is picked from the extension of the output name: '.npy' is
+    binary, anything else is CSV. Names without an extension get '.csv'.
+    - A writer can reopen an existing file at a byte position returned by
+    sync(), so an interrupted run can continue where a checkpoint was taken.
+    - 1D runs write the position and velocity along x of every particle. 2D
+    runs also write them along y.
+'''
+
+import json
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+class Writer:
+    '''
+    * Base class of every sink. Buffers rows of [step, 0_x, 0_vx, 1_x, ...],
+    with one column per field of every particle.
+    '''
+    def __init__(self, filename: str, n_particles: int, chunk: int = 1024, 
+                 position: int = None, rows: int = 0, fields: list = None):
+
+        assert chunk >= 1, "Chunk must hold at least 1 row"
+
+        self.filename = filename
+        self.n = n_particles
+        self.chunk = chunk
+        self.position = position
+        self.rows = rows
+        self.fields = FIELDS["1D"] if fields is None else fields
+
+        self.__buffer = np.empty((chunk, 1 + len(self.fields) * n_particles))
+        self.__filled = 0
+        self.__error = None
+
+        self._open()
+
+        self.__queue = queue.Queue(maxsize = 8)
+        self.__thread = threading.Thread(target = self.__work, daemon = True)
+        self.__thread.start()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.filename}, rows = {self.rows})"
+
+    @property
+    def columns(self):
+        return [f"{i}_{name}" for i in range(self.n) for name in self.fields]
+
+    def write(self, steps, *values: np.ndarray):
+        '''
+        * Buffer one sample, or one sample per row if the values are 2D. One
+        array of values is given per field.
+        '''
+        steps = np.atleast_1d(steps)
+        values = [np.atleast_2d(value) for value in values]
+        stride = len(self.fields)
+
+        start = 0
+        while start < len(steps):
+            size = min(len(steps) - start, self.chunk - self.__filled)
+            rows = slice(self.__filled, self.__filled + size)
+            self.__buffer[rows, 0] = steps[start:start + size]
+            for field, value in enumerate(values):
+                self.__buffer[rows, 1 + field::stride] = value[start:start + size]
+
+            self.__filled += size
+            self.rows += size
+            start += size
+
+            if self.__filled == self.chunk:
+                self.flush()
+
+    def flush(self):
+        '''
+        * Hand the buffered rows to the background thread.
+        '''
+        if self.__error is not None:
+            raise self.__error
+
+        if self.__filled > 0:
+            self.__queue.put(self.__buffer[:self.__filled].copy())
+            self.__filled = 0
+
+    def sync(self):
+        '''
+        * Write every buffered row and wait until it is on disk. Returns the
+        byte position of the end of the file and the number of rows written.
+        '''
+        self.flush()
+        self.__queue.join()
+
+        if self.__error is not None:
+            raise self.__error
+
+        return self.file.tell(), self.rows
+
+    def close(self):
+        '''
+        * Write the remaining rows and wait until everything is on disk.
+        '''
+        self.flush()
+        self.__queue.put(None)
+        self.__thread.join()
+
+        if self.__error is not None:
+            raise self.__error
+
+        self._close()
+
+    def __work(self):
+        '''
+        * Write chunks until close() is called.
+        '''
+        while True:
+            rows = self.__queue.get()
+            if rows is None:
+                self.__queue.task_done()
+                return
+            if self.__error is None:
+                try:
+                    self._write(rows)
+                except Exception as e:
+                    self.__error = e
+
+            self.__queue.task_done()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write(self, rows: np.ndarray):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+class CSVWriter(Writer):
+    '''
+    * Text output with one column per position and velocity.
+    '''
+    def _open(self):
+        if self.position is not None:
+            self.file = open(self.filename, "r+")
+            self.file.seek(self.position)
+            self.file.truncate()
+            return
+
+        self.file = open(self.filename, "w")
+        self.file.write(",".join(self.columns) + "\n")
+
+    def _write(self, rows: np.ndarray):
+        self.file.write(format_rows(rows[:, 1:]))
+        self.file.flush()
+
+    def _close(self):
+        self.file.close()
+
+class NPYWriter(Writer):
+    '''
+    * Binary output. A time-major .npy array of [step, 0_x, 0_vx, 1_x, ...]
+    rows, next to a .json header with particle metadata and run configuration.
+    * NOTE:
+        - The .npy header reserves space for the final shape and is rewritten
+        when the writer closes. A reader recovers the rows of an unfinished run
+        from the file size.
+    '''
+    HEADER = 128 # bytes
+
+    def __init__(self, filename: str, n_particles: int, metadata: dict = None,
+                 chunk: int = 1024, position: int = None, rows: int = 0, 
+                 fields: list = None):
+        self.metadata = {} if metadata is None else metadata
+        super().__init__(filename, n_particles, chunk, position, rows, fields)
+
+    def _open(self):
+        if self.position is not None:
+            self.file = open(self.filename, "r+b")
+            self.file.seek(self.position)
+            self.file.truncate()
+        else:
+            self.file = open(self.filename, "wb")
+            self.file.write(npy_header(0, len(self.columns) + 1, self.HEADER))
+        self.__write_header(complete = False)
+
+    def _write(self, rows: np.ndarray):
+        self.file.write(rows.astype("<f8").tobytes())
+        self.file.flush()
+
+    def _close(self):
+        self.file.seek(0)
+        self.file.write(npy_header(self.rows, len(self.columns) + 1, self.HEADER))
+        self.file.close()
+        self.__write_header(complete = True)
+
+    def __write_header(self, complete: bool):
+        header = dict(self.metadata)
+        header.update({"columns": ["step"] + self.columns, "fields": self.fields, 
+                       "rows": self.rows,
+                       "complete": complete})
+
+        with open(header_path(self.filename), "w") as file:
+            json.dump(header, file, indent = 2)
+
+class TrajectoryFile:
+    '''
+    * Memory-mapped reader for binary trajectories. Slicing a particle or a time
+    window only reads that part of the file.
+    '''
+    def __init__(self, filename: str):
+
+        with open(header_path(filename)) as file:
+            self.header = json.load(file)
+
+        with open(filename, "rb") as file:
+            np.lib.format.read_magic(file)
+            _, _, _ = np.lib.format.read_array_header_1_0(file)
+            offset = file.tell()
+
+        columns = len(self.header["columns"])
+        rows = (os.path.getsize(filename) - offset) // (8 * columns)
+
+        self.filename = filename
+        self.fields = self.header.get("fields", FIELDS["1D"])
+        if rows == 0:
+            self.data = np.empty((0, columns))
+        else:
+            self.data = np.memmap(filename, dtype = "<f8", mode = "r", offset = offset,
+                                  shape = (rows, columns))
+
+    def __repr__(self):
+        return f"TrajectoryFile({self.filename}, particles = {self.n}, samples = {len(self)})"
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    @property
+    def n(self):
+        return (self.data.shape[1] - 1) // len(self.fields)
+
+    @property
+    def steps(self):
+        return self.data[:, 0]
+
+    @property
+    def times(self):
+        '''
+        * Simulation time of each sample.
+        '''
+        return self.steps * self.header.get("delta_t", 1)
+
+    @property
+    def x(self):
+        return self.field("x")
+
+    @property
+    def vx(self):
+        return self.field("vx")
+
+    @property
+    def y(self):
+        return self.field("y")
+
+    @property
+    def vy(self):
+        return self.field("vy")
+
+    def field(self, name: str):
+        '''
+        * Values of one field, one row per sample and one column per particle.
+        '''
+        assert name in self.fields, f"{name} is not recorded in this file"
+        return self.data[:, 1 + self.fields.index(name)::len(self.fields)]
+
+    def particle(self, index: int):
+        '''
+        * Every field of one particle for every sample, e.g. position and
+        velocity in 1D.
+        '''
+        start = 1 + len(self.fields) * index
+        return tuple(self.data[:, start + field] for field in range(len(self.fields)))
+
+    def window(self, start: float, end: float):
+        '''
+        * Rows of every sample with start <= time <= end.
+        '''
+        delta_t = self.header.get("delta_t", 1)
+        first = self.__search(start / delta_t, right = False)
+        last = self.__search(end / delta_t, right = True)
+        return self.data[first:last]
+
+    def __search(self, step: float, right: bool):
+        '''
+        * Binary search over the step column, so only a few rows are read.
+        '''
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            value = self.data[middle, 0]
+            if value < step or (right and value == step):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+WRITERS = {".csv": CSVWriter, ".npy": NPYWriter}
+FIELDS = {"1D": ["x", "vx"], "2D": ["x", "vx", "y", "vy"]}
+
+def output_path(output: str):
+    '''
+    * Output filename with its extension. Names without a known extension are
+    written as CSV.
+    '''
+    _, extension = os.path.splitext(output)
+    return output if extension in WRITERS else output + ".csv"
+
+def open_writer(filename: str, n_particles: int, metadata: dict = None,
+                position: int = None, rows: int = 0, mode: str = "1D"):
+    '''
+    * Create the writer that matches the extension of filename. With a
+    position, the existing file is continued from there.
+    '''
+    _, extension = os.path.splitext(filename)
+    if extension == ".npy":
+        return NPYWriter(filename, n_particles, metadata, position = position, rows = rows,
+                         fields = FIELDS[mode])
+    return CSVWriter(filename, n_particles, position = position, rows = rows,
+                     fields = FIELDS[mode])
+
+def header_path(filename: str):
+    return os.path.splitext(filename)[0] + ".json"
+
+def npy_header(rows: int, columns: int, size: int):
+    '''
+    * Version 1.0 .npy header for a float64 array, padded to exactly size bytes.
+    '''
+    header = repr({"descr": "<f8", "fortran_order": False, "shape": (rows, columns)})
+    header = header.ljust(size - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+def format_rows(rows: np.ndarray):
+    '''
+    * Format rows the same way as pandas.DataFrame.to_csv. Missing values are
+    left empty.
+    '''
+    if np.isnan(rows).any():
+        lines = [",".join("" if value != value else repr(value) for value in row)
+                 for row in rows.tolist()]
+    else:
+        lines = [",".join(map(repr, row)) for row in rows.tolist()]
+
+    return "\n".join(lines) + "\n"
@@ -2,9 +2,7 @@
 * Object representation of a particle. 
 '''
 
-import numpy as np 
-import matplotlib.pyplot as plt 
-from matplotlib.patches import Rectangle 
+from state import State 
 
 class Particle:
     def __init__(self, length: float, width: float, mass: float,
@@ -18,10 +16,12 @@ class Particle:
         self.width = width 
         self.mass = mass 
 
-        self._x = []; self.x = x 
-        self._vx = []; self.vx = vx 
-        self._y = []; self.y = y
-        self._vy = []; self.vy = vy 
+        self._state = State(1)
+        self._index = 0
+        self._state.x[0] = x; self._state.vx[0] = vx 
+        self._state.y[0] = y; self._state.vy[0] = vy 
+        self._state.mass[0] = mass 
+        self._state.length[0] = length; self._state.width[0] = width 
 
     def __repr__(self):
         return f"Particle({self.id}, {self.length}, {self.width}, {self.mass}, " \
@@ -39,77 +39,83 @@ class Particle:
         '''
         return self.id == other.id 
 
+    @classmethod 
+    def view(cls, state: State, index: int, particle_id: int = None):
+        '''
+        * Particle that is a view of one entry of a shared state, without 
+        allocating a state of its own.
+        '''
+        particle = cls.__new__(cls)
+        particle.id = particle_id 
+        particle.length = float(state.length[index])
+        particle.width = float(state.width[index])
+        particle.mass = float(state.mass[index])
+        particle.bind(state, index)
+        return particle 
+
+    def bind(self, state: State, index: int):
+        '''
+        * Make this particle a view of one entry of a shared state.
+        '''
+        self._state = state 
+        self._index = index 
+
     @property 
     def x(self):
-        return self._x 
+        return self._state.history("x", self._index) 
     
     @x.setter 
-    def x(self, value: int):
-        self._x.append(value)
+    def x(self, value: float):
+        self._state.x[self._index] = value 
     
     @property 
     def y(self):
-        return self._y 
+        return self._state.history("y", self._index) 
     
     @y.setter 
-    def y(self, value: int):
-        self._y.append(value)
+    def y(self, value: float):
+        self._state.y[self._index] = value 
     
     @property 
     def vx(self):
-        return self._vx 
+        return self._state.history("vx", self._index) 
     
     @vx.setter 
-    def vx(self, value: int):
-        self._vx.append(value)
+    def vx(self, value: float):
+        self._state.vx[self._index] = value 
     
     @property 
     def vy(self):
-        return self._vy 
+        return self._state.history("vy", self._index) 
     
     @vy.setter 
-    def vy(self, value: int):
-        self._vy.append(value)
+    def vy(self, value: float):
+        self._state.vy[self._index] = value 
 
     def overlap(self, other):
         if self != other:
-            return True if not (self.x[-1] <= other.x[-1] and self.x[-1] + \
-                   self.length <= other.x[-1]) else False
+            x, other_x = self._state.x[self._index], other._state.x[other._index]
+            return True if x < other_x + other.length and other_x < x + self.length \
+                   else False
         return False 
         
     def ke(self):
         '''
         * Compute the kinetic energy of this particle.
         '''
-        return 0.5 * self.mass * (self.vx[-1] ** 2 + self.vy[-1] ** 2) 
+        return 0.5 * self.mass * (self._state.vx[self._index] ** 2 + \
+                                  self._state.vy[self._index] ** 2) 
     
-    def draw(self, ax: plt.axes, add_patch: bool = True):
+    def draw(self, ax: "matplotlib.axes.Axes", add_patch: bool = True):
         '''
         * Represent a particle for animation.
         '''
-        rectangle = Rectangle((self._x[-1], self._y[-1]), self.length, self.width, 
-                               edgecolor = 'r', fill = False)
+        from matplotlib.patches import Rectangle 
+
+        xy = (self._state.x[self._index], self._state.y[self._index])
+        rectangle = Rectangle(xy, self.length, self.width, edgecolor = 'r', fill = False)
         
         if add_patch:
             ax.add_patch(rectangle)
             
         return rectangle
-    
-    def update(self, length: int = None, width: int = None):
-        '''
-        * Update list of positions and velocities if they are out of bound.
-        '''
-
-        if length is not None:
-            for x, vx in zip(self.x, self.vx):
-                if x < 0 or x > length:
-                    self.x.pop(self.x.index(x))
-                    self.vx.pop(self.vx.index(vx))
-        
-        if width is not None:
-            for y, vy in zip(self.y, self.vy):
-                if y < 0 or y > width:
-                    self.y.pop(self.y.index(y))
-                    self.vy.pop(self.vy.index(vy))
-
-        
\ No newline at end of file
@@ -0,0 +1,132 @@
+'''
+* Storage of recorded samples, shared by the trajectory and the conservation
+diagnostics.
+* NOTE:
+    - Every sample is one row of a few named columns, e.g. the positions of
+    every particle and the step they belong to.
+    - Without a limit, rows go into blocks that start small and double up to
+    max_rows, so memory follows the number of recorded samples rather than
+    the size of a full block.
+    - With a limit of N, only the last N rows are kept in a ring buffer. It
+    also starts small and doubles up to N before it starts to wrap.
+'''
+
+import numpy as np
+
+class Recording:
+    FIRST = 16 # rows in the first block
+
+    def __init__(self, columns: dict, max_rows: int, last: int = None):
+        '''
+        * columns maps the name of each column to the shape of one row and its
+        dtype, e.g. {"x": ((n,), float), "step": ((), int)}.
+        '''
+        assert max_rows >= 1, "Blocks must hold at least 1 row"
+        assert last is None or last >= 1, "Must keep at least 1 row"
+
+        self.columns = columns
+        self.max_rows = max_rows if last is None else last
+        self.last = last
+        self.clear()
+
+    def __repr__(self):
+        return f"Recording({list(self.columns)}, rows = {len(self)}, last = {self.last})"
+
+    def __len__(self):
+        if self.last is not None:
+            return min(self.count, self.last)
+        return self.count
+
+    @property
+    def nbytes(self):
+        '''
+        * Memory held by the blocks, filled or not.
+        '''
+        return sum(values.nbytes for block in self._blocks for values in block.values())
+
+    def clear(self):
+        '''
+        * Drop every row.
+        '''
+        self._blocks = []
+        self._filled = 0 # rows filled in the last block
+        self.count = 0
+
+    def append(self, rows: dict):
+        '''
+        * Copy rows into the next free rows, one block or ring pass at a time.
+        rows maps every column to its values, one row per sample.
+        '''
+        total = len(next(iter(rows.values())))
+        start = 0
+
+        while start < total:
+            if self.__full():
+                self.__grow()
+
+            block = self._blocks[-1]
+            capacity = self.__size(block)
+            row = self._filled if self.last is None else self.count % capacity
+
+            size = min(total - start, capacity - row)
+            for name, values in block.items():
+                values[row:row + size] = rows[name][start:start + size]
+
+            self.count += size
+            start += size
+            self._filled = row + size if self.last is None else min(self.count, capacity)
+
+    def ordered(self, name: str, index: int = None):
+        '''
+        * The kept values of one column in the order they were recorded, or
+        only the values at index within each row.
+        '''
+        shape, dtype = self.columns[name]
+        if self.count == 0:
+            return np.empty((0,) + (shape if index is None else shape[1:]), dtype = dtype)
+
+        blocks = [block[name] if index is None else block[name][:, index]
+                  for block in self._blocks]
+        if self.last is not None:
+            block = blocks[0]
+            if self.count <= self.last:
+                return block[:self.count].copy()
+            start = self.count % self.last
+            return np.concatenate([block[start:], block[:start]])
+
+        return np.concatenate(blocks[:-1] + [blocks[-1][:self._filled]])
+
+    def __size(self, block: dict):
+        '''
+        * Number of rows of a block.
+        '''
+        return len(next(iter(block.values())))
+
+    def __full(self):
+        '''
+        * Whether the next row needs a new block or a larger ring buffer.
+        '''
+        if len(self._blocks) == 0:
+            return True
+        capacity = self.__size(self._blocks[-1])
+        return self._filled == capacity and (self.last is None or capacity < self.last)
+
+    def __grow(self):
+        '''
+        * Make room for more rows: a new block twice the size of the previous
+        one, or a ring buffer twice as large until it holds last rows.
+        '''
+        size = self.FIRST if len(self._blocks) == 0 else 2 * self.__size(self._blocks[-1])
+        block = {name: np.empty((min(size, self.max_rows),) + shape, dtype = dtype)
+                 for name, (shape, dtype) in self.columns.items()}
+
+        if self.last is None:
+            self._blocks.append(block)
+            self._filled = 0
+        elif len(self._blocks) == 0:
+            self._blocks = [block]
+        else:
+            # The ring has not wrapped yet, so its rows are in order.
+            for name, values in block.items():
+                values[:self._filled] = self._blocks[0][name][:self._filled]
+            self._blocks = [block]
@@ -0,0 +1,221 @@
+'''
+* Offline rendering. Draws the frames of a saved trajectory across a process
+pool with the Agg backend and joins them into a GIF, an MP4 or a directory of
+PNG images, without running the simulation again.
+* Usage: python render.py output.npy --output output.gif --fps 30 --every 1
+  --workers 32
+* NOTE:
+    - Binary trajectories (.npy) hold the particle sizes and the boundary in
+    their .json header. CSV files do not, so --length, --width and --dt are
+    needed and every particle is drawn as a unit square.
+    - The frames are split into contiguous ranges. Each worker draws its
+    ranges on one figure of its own, only moving the rectangles between frames.
+    - GIFs are assembled with Pillow, which holds every frame in memory. Use an
+    MP4 (needs ffmpeg) or an image sequence for very long runs.
+'''
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from output import TrajectoryFile
+
+FRAME = "frame_{:06d}.png"
+
+def load(filename: str, length: float = None, width: float = None, delta_t: float = None):
+    '''
+    * Sample times, positions and particle sizes of a trajectory file, with
+    one row per sample and one column per particle.
+    '''
+    if os.path.splitext(filename)[1] == ".npy":
+        trajectory = TrajectoryFile(filename)
+        header, particles = trajectory.header, trajectory.header["particles"]
+
+        if "y" in trajectory.fields:
+            y = trajectory.y
+        else:
+            y = np.broadcast_to(particles.get("y", np.zeros(trajectory.n)),
+                                (len(trajectory), trajectory.n))
+
+        return {"times": trajectory.times, "x": trajectory.x, "y": y,
+                "lengths": np.asarray(particles["length"], dtype = float),
+                "widths": np.asarray(particles["width"], dtype = float),
+                "length": header["length"], "width": header["width"]}
+
+    assert None not in [length, width, delta_t], "CSV files need --length, --width and --dt"
+
+    with open(filename) as file:
+        columns = file.readline().strip().split(",")
+    data = np.atleast_2d(np.genfromtxt(filename, delimiter = ",", skip_header = 1))
+
+    # Columns are named '<particle>_<field>', one group of fields per particle.
+    fields = list(dict.fromkeys(column.split("_", 1)[1] for column in columns))
+    n = len(columns) // len(fields)
+    x = data[:, fields.index("x")::len(fields)]
+    y = data[:, fields.index("y")::len(fields)] if "y" in fields else np.zeros_like(x)
+
+    return {"times": np.arange(len(data)) * delta_t, "x": x, "y": y,
+            "lengths": np.ones(n), "widths": np.ones(n), "length": length, "width": width}
+
+def figure(length: float, width: float, lengths: np.ndarray, widths: np.ndarray,
+           dpi: int = 100):
+    '''
+    * Agg figure of the boundary with one rectangle per particle and a text.
+    Frames are drawn by moving the rectangles and changing the text.
+    '''
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Rectangle
+
+    # A Figure without pyplot always draws with Agg and needs no display.
+    fig = Figure(dpi = dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for spine in ["top", "bottom", "left", "right"]:
+        ax.spines[spine].set_linewidth(2)
+    ax.set_aspect("equal", "box")
+    ax.set_xlim(0, length)
+    ax.set_ylim(0, width)
+    ax.xaxis.set_ticks([])
+    ax.yaxis.set_ticks([])
+
+    rectangles = [ax.add_patch(Rectangle((0, 0), size_x, size_y, edgecolor = 'r', fill = False))
+                  for size_x, size_y in zip(lengths, widths)]
+    text = ax.text(0.5, width - 0.5, "", color = "r", fontsize = "15")
+    return fig, rectangles, text
+
+def move(rectangles: list, x: np.ndarray, y: np.ndarray):
+    '''
+    * Move the rectangles to the positions of one sample.
+    '''
+    for rectangle, position in zip(rectangles, zip(x, y)):
+        rectangle.set_xy(position)
+
+def draw(job: dict):
+    '''
+    * Draw a range of frames to PNG files. Returns the number of frames.
+    '''
+    fig, rectangles, text = figure(job["length"], job["width"], job["lengths"],
+                                   job["widths"], job["dpi"])
+
+    for frame, t, x, y in zip(job["frames"], job["times"], job["x"], job["y"]):
+        move(rectangles, x, y)
+        text.set_text("t:{:.2f}s".format(t))
+        fig.savefig(os.path.join(job["directory"], FRAME.format(frame)))
+
+    return len(job["frames"])
+
+def jobs(data: dict, samples: np.ndarray, directory: str, workers: int, dpi: int):
+    '''
+    * Split the sampled rows into a few contiguous ranges per worker, so
+    ranges that draw slower do not hold up the rest.
+    '''
+    frames = np.arange(len(samples))
+    ranges = np.array_split(frames, min(len(frames), 4 * workers))
+
+    return [{"frames": frame_range, "directory": directory, "dpi": dpi,
+             "times": data["times"][samples[frame_range]],
+             "x": np.asarray(data["x"][samples[frame_range]]),
+             "y": np.asarray(data["y"][samples[frame_range]]),
+             "lengths": data["lengths"], "widths": data["widths"],
+             "length": data["length"], "width": data["width"]}
+            for frame_range in ranges]
+
+def assemble(directory: str, frames: int, output: str, fps: float):
+    '''
+    * Join the PNG frames of directory into a GIF or an MP4.
+    '''
+    paths = [os.path.join(directory, FRAME.format(frame)) for frame in range(frames)]
+
+    if os.path.splitext(output)[1] == ".gif":
+        from PIL import Image
+
+        images = [Image.open(path).convert("RGB") for path in paths]
+        images[0].save(output, save_all = True, append_images = images[1:],
+                       duration = 1000 / fps, loop = 0)
+    else:
+        assert shutil.which("ffmpeg") is not None, "MP4 output needs ffmpeg"
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-framerate", str(fps),
+                        "-i", os.path.join(directory, "frame_%06d.png"),
+                        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p",
+                        output], check = True)
+
+def render(filename: str, output: str, fps: float = 30, every: int = 1,
+           workers: int = None, dpi: int = 100, length: float = None,
+           width: float = None, delta_t: float = None):
+    '''
+    * Render every k-th sample of a trajectory file. An output ending in
+    .gif or .mp4 is a movie, anything else is a directory of PNG frames.
+    Returns the number of frames.
+    '''
+    assert every >= 1, "Must render at least every sample"
+    workers = workers or os.cpu_count()
+
+    data = load(filename, length, width, delta_t)
+    samples = np.arange(0, len(data["times"]), every)
+    assert len(samples) > 0, "Trajectory has no samples"
+
+    movie = os.path.splitext(output)[1] in [".gif", ".mp4"]
+    directory = tempfile.mkdtemp() if movie else output
+    os.makedirs(directory, exist_ok = True)
+
+    try:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            frames = sum(executor.map(draw, jobs(data, samples, directory, workers, dpi)))
+
+        if movie:
+            assemble(directory, frames, output, fps)
+    finally:
+        if movie:
+            shutil.rmtree(directory)
+
+    return frames
+
+def arguments():
+    '''
+    * Command line arguments.
+    '''
+    parser = argparse.ArgumentParser(
+        prog = "Render",
+        description = "Render a saved trajectory to a GIF, an MP4 or PNG frames"
+    )
+
+    parser.add_argument("trajectory", type = str,
+                        help = "Trajectory file written by the simulation (.npy or .csv)")
+    parser.add_argument("--output", type = str, default = "output.gif",
+                        help = "'.gif' or '.mp4' for a movie, otherwise a directory of frames")
+    parser.add_argument("--fps", type = float, default = 30,
+                        help = "Frames per second of the movie")
+    parser.add_argument("--every", type = int, default = 1,
+                        help = "Render every k-th sample")
+    parser.add_argument("--dpi", type = int, default = 100,
+                        help = "Resolution of the frames")
+    parser.add_argument("--workers", type = int, default = os.cpu_count(),
+                        help = "Number of worker processes")
+
+    #CSV info
+    parser.add_argument("--length", type = float, default = None,
+                        help = "The boundary of the simulation, for CSV files")
+    parser.add_argument("--width", type = float, default = None,
+                        help = "The boundary in the y direction, for CSV files")
+    parser.add_argument("--dt", type = float, default = None,
+                        help = "Time between two rows, for CSV files")
+
+    return parser.parse_args()
+
+def main():
+    parser = arguments()
+
+    start = time.perf_counter()
+    frames = render(parser.trajectory, parser.output, parser.fps, parser.every,
+                    parser.workers, parser.dpi, parser.length, parser.width, parser.dt)
+    print(f"Rendered {frames} frames to {parser.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
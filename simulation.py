@@ -1,24 +1,44 @@
 #https://stackoverflow.com/questions/58237086/how-to-animate-a-line-chart-in-a-streamlit-page
+'''
+* NOTE: 
+    - Only NumPy is imported at module level. Matplotlib is imported when an 
+    animation is used, so headless runs start quickly.
+    - With checkpoint = N, the full state is saved every N steps next to the 
+    output. With resume, a simulation built from the same arguments continues 
+    from that checkpoint and writes the same output as an uninterrupted run.
+'''
 
 from particle import * 
 from system import * 
+from state import State 
+from trajectory import Trajectory 
+from broadphase import SortAndSweep, SpatialHash 
+from event import EventEngine 
+from adaptive import AdaptiveStep 
+from analytic import FastForward 
+from output import open_writer, output_path 
+import checkpoint as checkpoints 
+from diagnostics import Conservation 
+from initializer import random_state 
 
 import numpy as np 
-import pprint
-import pandas as pd
-import matplotlib.pyplot as plt 
-from matplotlib import animation 
-import itertools 
-import streamlit as st 
-import streamlit.components.v1 as components 
+import os 
  
 class Simulation:
     def __init__(self, output: str, mode: str, particles: list, n_particles: int, 
                  length: int, width: int, max_vx: int, max_vy: int, 
-                 max_t: int, delta_t: float, system_info: dict):
+                 max_t: int, delta_t: float, system_info: dict, engine: str = "step",
+                 recording: dict = None, tolerance: float = 1e-3, 
+                 checkpoint: int = None, resume: bool = False, seed: int = 1, 
+                 distributions: dict = None):
         
         self.output = output 
 
+        assert engine in ["step", "event", "adaptive", "analytic"], \
+            "Engine must be step, event, adaptive or analytic"
+        assert engine == "step" or mode == "1D", "Event, adaptive and analytic engines only support 1D"
+        self.engine = engine 
+
         assert mode in ["1D", "2D"], "Simluation must be 1D or 2D"
         self.mode = mode
         
@@ -30,119 +50,135 @@ class Simulation:
         self.time = 0
         self.max_t = max_t
         self.delta_t = delta_t 
-
+        self.tolerance = tolerance 
+
+        assert checkpoint is None or checkpoint >= 1, "Must checkpoint at least every step"
+        assert not (checkpoint or resume) or output != "", "Checkpoints need an output file"
+        assert not (checkpoint or resume) or engine != "event", \
+            "Event engine does not support checkpoints"
+        self.checkpoint = checkpoint 
+        self.__last_checkpoint = 0 
+        snapshot = None 
+        if resume:
+            filename = checkpoints.checkpoint_path(output_path(output))
+            assert os.path.exists(filename), f"No checkpoint to resume from: {filename}"
+            snapshot = checkpoints.load(filename)
+
+        self.rng = np.random.default_rng(seed)
         self.particles = particles
         if len(self.particles) == 0:
-            self.__init_particles(n_particles, max_vx, max_vy)
+            self.__init_particles(n_particles, max_vx, max_vy, distributions)
         else:
             for i in range(len(particles)):
                 particles[i].id = i 
-
-        self.system = System(self.particles, **system_info)
-        self.exit = True 
-
-    def animation(self):
+            self.state = State.from_particles(self.particles, mode)
+        #Recording policy, e.g. {"every": 10}, {"last": 100} or {"final": True}
+        recording = {} if recording is None else recording 
+        self.trajectory = Trajectory(len(self.particles), **recording)
+        self.state.trajectory = self.trajectory 
+
+        self.writer = None 
+        if self.output != "":
+            metadata = {
+                "mode": mode, "length": length, "width": width, "max_t": max_t, 
+                "delta_t": delta_t, "engine": engine, "tolerance": tolerance, 
+                "system": system_info, 
+                "recording": recording, 
+                "particles": {"mass": self.state.mass.tolist(), 
+                              "length": self.state.length.tolist(), 
+                              "width": self.state.width.tolist(), 
+                              "y": self.state.y.tolist()}
+            }
+            position, rows = (None, 0) if snapshot is None else \
+                (int(snapshot["writer_position"]), int(snapshot["writer_rows"]))
+            self.writer = open_writer(output_path(self.output), self.state.n, metadata, 
+                                      position, rows, mode)
+            self.trajectory.sink = self.writer 
+
+        if snapshot is None:
+            self.trajectory.record(self.state)
+
+        self.system = System(self.state, **system_info, mode = mode)
+        self.broad_phase = SortAndSweep() if mode == "1D" else SpatialHash()
+        if self.engine == "event":
+            self.event = EventEngine(self.state, self.system, self.length)
+        if self.engine in ["adaptive", "analytic"]:
+            self.adaptive = AdaptiveStep(self.state, self.system, self.length, tolerance)
+        if self.engine == "analytic":
+            self.fast_forward = FastForward(self.state, self.system, self.length)
+        self.conservation = Conservation(self.state, self.system, **recording)
+
+        if snapshot is not None:
+            self.__restore(snapshot)
+
+    def animation(self, steps_per_frame: int = None, fps: float = 30):
         '''
-        * Add animations to object. The computation is done from function call 
-        to __animate().
+        * Add animations to object. The particles are drawn once, then every 
+        frame __animate() advances steps_per_frame time steps and moves them.
+        * NOTE: 
+            - Frames are shown at most fps times a second whatever delta_t is. 
+            By default a frame covers 1 / fps seconds, so the animation plays in 
+            real time.
         '''
 
-        fig, self.ax = plt.subplots()
-        for spine in ["top", "bottom", "left", "right"]:
-            self.ax.spines[spine].set_linewidth(2)
-        self.ax.set_aspect("equal", "box")
-        self.ax.set_xlim(0, self.length)
-        self.ax.set_ylim(0, self.width)
-        self.ax.xaxis.set_ticks([])
-        self.ax.yaxis.set_ticks([])
+        import matplotlib.pyplot as plt 
+        from matplotlib import animation 
+
+        self.__init_plot()
+        self.steps_per_frame = steps_per_frame or self.__steps_per_frame(fps)
 
         try:
+            # Frames are not cached, so a long animation does not grow in memory.
             self.animate = animation.FuncAnimation(
-                fig, self.__animate, init_func = self.__init_animation, 
-                frames = 1600, interval = 1, blit = True
+                self.fig, self.__animate, init_func = self.__init_artists, 
+                interval = 1000 / fps, blit = True, cache_frame_data = False
             )
             plt.show()
         except Exception as e:
             exit(0)
 
-    def streamlit_animation(self):
+    def run(self):
         '''
-        * Animation for streamlit.
+        * Advance the simulation as fast as possible until max_t without any
+        animation, then write the output. Nothing is drawn, so this works 
+        without a display.
         '''
-        def animate(plot):
-            while True:
-                self.__animate(0)
-                rectangle = self.__init_animation()          
-
-                self.ax.patches = []
-                for i in rectangle:
-                    self.ax.add_patch(i)
-                
-                self.ax.texts = []
-                self.ax.text(0.5, self.width - 0.5, "KE:{:.2f}J".format(self.system.ke),
-                             color = "r", fontsize = "15")
-                momentum = sum([particle.mass * particle.vx[-1] for particle in self.particles])
-                self.ax.text(4, self.width - 0.5, r"Momentum:{:.2f}$kgm^2$".format(momentum),
-                             color = "r", fontsize = "15")
-                plot.pyplot(self.fig)
+        while self.time < self.max_t:
+            if self.engine == "analytic":
+                self.__fast_forward()
+            else:
+                self.__step()
+            self.__checkpoint()
 
-        self.exit = False
-
-        self.__init_plot()
-        rectangle = self.__init_animation(False)   
-        for i in rectangle:
-            self.ax.add_patch(i)
-        
-        self.ax.text(0.5, self.width - 0.5, "KE:{:.2f}J".format(self.system.ke),
-                     color = "r", fontsize = "15")
-        momentum = sum([particle.mass * particle.vx[-1] for particle in self.particles])
-        self.ax.text(4, self.width - 0.5, r"Momentum:{:.2f}$kgm^2$".format(momentum),
-                    color = "r", fontsize = "15")
-        plot = st.pyplot(self.fig)
-        animate(plot)
+        self.__finish()
+        return self 
 
     def __repr__(self):
+        particles = self.particles if len(self.particles) <= 10 else \
+            f"{len(self.particles)} particles"
         return f"Configuration\nMode: {self.mode}, Length: {self.length}, " + \
-            f"Width: {self.width}, \n{self.particles}" 
+            f"Width: {self.width}, \n{particles}" 
 
     def __debug(self):
         info = " ".join([str(particle) for particle in self.particles])
         print(info)
 
-    def __init_particles(self, n_particles: int, max_vx: int, max_vy: int):
+    def __init_particles(self, n_particles: int, max_vx: int, max_vy: int, 
+                         distributions: dict):
 
         '''
         * If not reading from file, then randomly generate a simulation of 
         n particles. 
         * NOTE: 
-            - For random initialization, mass, length, and width are set to 1. 
+            - By default mass, length, and width are set to 1. See 
+            initializer.py for other distributions.
         '''
-        np.random.seed(1)
-
         print("Begin random initialization")
 
-        mass = 1 #kg 
-        length = 1; width = 1 #m
-
-        xpos = [pos for pos in range(self.length)]
-        ypos = [pos for pos in range(self.width)]
-        vx = [v for v in range(-1 * max_vx, max_vx + 1) if v != 0]
-        vy = [v for v in range(-1 * max_vy, max_vy + 1) if v != 0]
-
-        for index, i in enumerate(range(n_particles)):
-            x = int(np.random.choice(xpos))
-            v_x = int(np.random.choice(vx))
-            xpos.pop(xpos.index(x)) #Remove xposition so there won't be overlaps 
-
-            y = 0
-            v_y = 0
-            if self.mode == "2D":
-                y = np.random.choice(ypos)
-                v_y = np.random.choice(vy)
-                ypos.pop(ypos.index(y)) #Remove yposition so there won't be overlaps  
-
-            particle = Particle(length, width, mass, x, y, v_x, v_y, index)
-            self.particles.append(particle)
+        self.state = random_state(n_particles, self.length, self.width, self.mode, 
+                                  self.rng, max_vx, max_vy, distributions)
+        self.particles = [Particle.view(self.state, index, index) 
+                          for index in range(n_particles)]
         
         print(self.__repr__())
         print("Finish random initialization")
@@ -158,69 +194,205 @@ class Simulation:
         
         return position 
 
-    def __animate(self, frame: int):
+    def __init_artists(self):
+        '''
+        * Draw every particle and the energy and momentum texts once. Later 
+        frames only move them with __draw().
+        * NOTE: 
+            - Matplotlib calls this again when the window is resized, so the 
+            artists of the current figure are reused.
+        '''
+        if self.rectangles is None:
+            self.rectangles = self.__init_animation()
+            self.ke_text = self.ax.text(0.5, self.width - 0.5, "", color = "r", fontsize = "15")
+            self.momentum_text = self.ax.text(4, self.width - 0.5, "", color = "r", fontsize = "15")
+        return self.__draw()
+
+    def __draw(self):
+        '''
+        * Move the artists of __init_artists() to the current state and return 
+        them.
+        '''
+        for rectangle, x, y in zip(self.rectangles, self.state.x, self.state.y):
+            rectangle.set_xy((x, y))
+
+        self.ke_text.set_text("KE:{:.2f}J".format(self.system.ke))
+        momentum = self.conservation.totals["momentum"]
+        self.momentum_text.set_text(r"Momentum:{:.2f}$kgm^2$".format(momentum))
+        return self.rectangles + [self.ke_text, self.momentum_text]
+
+    def __steps_per_frame(self, fps: float):
+        '''
+        * Number of time steps in 1 / fps seconds.
         '''
-        * Compute new position and velocity for every particle by a time step 
-        delta_t
+        return max(1, round(1 / (fps * self.delta_t)))
+
+    def __advance(self, steps: int):
+        '''
+        * Advance by up to steps time steps without drawing, stopping at max_t.
         '''
-        if self.exit:
+        for _ in range(steps):
             if self.time >= self.max_t:
-                print("Program is out of time, terminating.")
-                if self.output != "":
-                    df = self.__get_output()
-                    df.to_csv(self.output + ".csv", index = False)
-                exit(0)
-
-        for index, particle in enumerate(self.particles):
-            self.particles[index] = self.system(self.delta_t, particle)
-        
+                break 
+            self.__step()
+            self.__checkpoint()
+
+    def __animate(self, frame: int):
+        '''
+        * Compute new position and velocity for every particle by 
+        steps_per_frame time steps of delta_t, then move the artists. 
+        '''
+        if self.time >= self.max_t:
+            print("Program is out of time, terminating.")
+            print(self.conservation.report())
+            self.__finish()
+            exit(0)
+
+        self.__advance(self.steps_per_frame)
+        return self.__draw()
+
+    def __step(self):
+        '''
+        * Advance every particle by one time step delta_t and record the result.
+        '''
+        if self.engine == "event":
+            self.event.advance(self.time + self.delta_t)
+        elif self.engine == "adaptive":
+            self.__substep()
+        elif self.engine == "analytic":
+            if self.fast_forward.horizon() >= self.delta_t:
+                self.fast_forward(np.array([self.delta_t]))
+            else:
+                self.__substep()
+        else:
+            self.system(self.delta_t, self.state)
+            self.__collision()
+
         self.time += self.delta_t 
-        
-        self.__collision()
-        return self.__init_animation()
+        self.state.step += 1
+        self.trajectory.record(self.state)
+        self.conservation.record(self.time)
     
+    def __fast_forward(self):
+        '''
+        * Sample every time step before the next possible contact at once in 
+        closed form. Falls back to a single step when a contact is closer than 
+        delta_t.
+        '''
+        samples = min(self.fast_forward.horizon() / self.delta_t, 
+                      max(1, Trajectory.BLOCK // self.state.n))
+        if samples < 2:
+            self.__step()
+            return 
+
+        # Add delta_t one at a time like __step(), so the sample times match. 
+        times = np.cumsum(np.append(self.time, np.full(int(samples), self.delta_t)))[1:]
+        times = times[:np.searchsorted(times, self.max_t) + 1]
+        steps = self.state.step + np.arange(1, len(times) + 1)
+
+        x, vx, dissipated, impulse = self.fast_forward(times - self.time)
+
+        self.time = float(times[-1])
+        self.state.step = int(steps[-1])
+        self.trajectory.record_rows(self.state, steps, {"x": x, "vx": vx})
+        self.conservation.record_rows(times, steps, vx, dissipated, impulse)
+
+    def __substep(self):
+        '''
+        * Advance to the next sample time in as few steps as the tolerance 
+        allows.
+        '''
+        remaining = self.delta_t 
+        while remaining > 0:
+            delta_t = self.adaptive(remaining)
+            self.system(delta_t, self.state)
+            self.__collision()
+            remaining = 0 if delta_t >= remaining else remaining - delta_t 
+
     def __collision(self):
         '''
         * Apply momentum of conservation if particles collided with walls or 
         each other.
         ''' 
 
-        for index, particle in enumerate(self.particles):
-            self.particles[index] = self.system.wall(
-                particle, self.length, self.width 
-            )
+        self.system.walls(self.state, self.length, self.width)
         
-        for i, j in itertools.combinations(range(len(self.particles)), 2):
-            if self.particles[i].overlap(self.particles[j]):
-                self.particles[i], self.particles[j] = self.system.momentum(
-                    self.particles[i], self.particles[j]
-                )
+        self.system.collisions(self.state, *self.broad_phase(self.state))
                 
-    def __get_output(self):
+    def __checkpoint(self):
         '''
-        * Get the position and velocity of each particle.
-        * NOTE: A dummy padding is applied if there is a length mismatch between 
-                columns.
+        * Save a checkpoint once every checkpoint steps. The analytic engine can
+        move several steps at once, so the step may have passed the multiple.
         '''
-        data = {}
+        if self.checkpoint is None or self.state.step < self.__next_checkpoint():
+            return 
+
+        position, rows = self.writer.sync()
+        state, system = self.state, self.system 
+        arrays = {
+            "time": self.time, "step": state.step, 
+            "ke": system.ke, "dissipated": system.dissipated, "impulse": system.impulse, 
+            "writer_position": position, "writer_rows": rows, 
+            "adaptive_steps": self.adaptive.steps if hasattr(self, "adaptive") else 0
+        }
+        arrays.update({name: getattr(state, name) for name in 
+                       ["x", "vx", "y", "vy", "mass", "length", "width"]})
+        arrays.update({"trajectory_" + name: values for name, values in 
+                       self.trajectory.snapshot().items()})
+        arrays.update({"conservation_" + name: values for name, values in 
+                       self.conservation.snapshot().items()})
+        arrays.update(checkpoints.random_state(self.rng))
+
+        checkpoints.save(checkpoints.checkpoint_path(output_path(self.output)), arrays)
+        self.__last_checkpoint = state.step 
+
+    def __next_checkpoint(self):
+        return (self.__last_checkpoint // self.checkpoint + 1) * self.checkpoint 
+
+    def __restore(self, snapshot: dict):
+        '''
+        * Continue from a checkpoint. The particles, system totals and 
+        recordings are replaced by the saved ones.
+        '''
+        self.time = float(snapshot["time"])
+        self.state.step = int(snapshot["step"])
+        for name in ["x", "vx", "y", "vy", "mass", "length", "width"]:
+            getattr(self.state, name)[:] = snapshot[name]
+
+        self.system._ke = float(snapshot["ke"])
+        self.system.dissipated = float(snapshot["dissipated"])
+        self.system.impulse = float(snapshot["impulse"])
+        if hasattr(self, "adaptive"):
+            self.adaptive.steps = int(snapshot["adaptive_steps"])
+
+        self.trajectory.restore({name[len("trajectory_"):]: values for name, values in 
+                                 snapshot.items() if name.startswith("trajectory_")})
+        self.conservation.restore({name[len("conservation_"):]: values for name, values in 
+                                   snapshot.items() if name.startswith("conservation_")})
+        checkpoints.set_random_state(self.rng, snapshot)
+        self.__last_checkpoint = self.state.step 
+
+    def __finish(self):
+        '''
+        * Record the final state if needed and finish writing the output file
+        if an output name was given.
+        '''
+        self.trajectory.finish(self.state)
 
-        for particle in self.particles:
-            data[str(particle.id) + "_x"] = particle.x
-            data[str(particle.id) + "_vx"] = particle.vx 
-        
-        max_length = 0        
-        for key in data.keys():
-            max_length = len(data[key]) if len(data[key]) > max_length else max_length 
-        
-        for key in data.keys():
-            if len(data[key]) < max_length:
-                pad = [None for i in range(max_length - len(data[key]))]
-                data[key].extend(pad)
+        if self.writer is not None:
+            self.writer.close()
 
-        return pd.DataFrame(data)
+        # A finished run has nothing to resume, so a later --resume fails loudly.
+        if self.checkpoint is not None:
+            filename = checkpoints.checkpoint_path(output_path(self.output))
+            if os.path.exists(filename):
+                os.remove(filename)
 
     def __init_plot(self):
+        import matplotlib.pyplot as plt 
+
         self.fig, self.ax = plt.subplots()
+        self.rectangles = None 
         for spine in ["top", "bottom", "left", "right"]:
             self.ax.spines[spine].set_linewidth(2)
         self.ax.set_aspect("equal", "box")
@@ -1,6 +1,23 @@
-from scipy.integrate import odeint
+'''
+* Free fall under constant forces, integrated with each computational method 
+and compared with the exact solution.
+* NOTE: 
+    - solver() and approximation() follow one trajectory, with odeint and a 
+    loop of single steps. SciPy is only imported when solver() is called. 
+    integrate() and convergence() compute every method for a whole array of 
+    time steps at once.
+    - Under a constant acceleration a, the velocity after k steps is 
+    v0 + a * k * dt for every method. So the displacement of every step is 
+    known up front, and positions are its cumulative sum.
+    - Runs with smaller time steps take more steps. Rows of the batched 
+    results are padded with NaN after their last step.
+'''
+
 import numpy as np
 
+METHODS = ["euler-cromer", "midpoint", "verlet"]
+CHUNK = 32
+
 def f_x():
     return 1
 
@@ -8,6 +25,7 @@ def f_y(mass: int, g: float):
     return -1 * mass * g 
 
 def solver(mass: int, g: float, xpos: int, vx: int, ypos: int, vy: int, t: int):
+    from scipy.integrate import odeint
 
     def varint(vararr, t):
         x, xt, y, yt = vararr
@@ -63,4 +81,112 @@ def approximate(method, x, y, v_x, v_y, ax, ay, dt):
         ypos = y[-1] + v_y[-1] * dt + 0.5 * ay * dt ** 2
         vy = v_y[-1] + 0.5 * (ay + ay) * dt 
 
-    return xpos, vx, ypos, vy
\ No newline at end of file
+    return xpos, vx, ypos, vy
+
+def displacement(method: str, velocity: np.ndarray, acceleration: np.ndarray, 
+                 delta_t: np.ndarray):
+    '''
+    * Displacement of each step, given the velocity before and after every 
+    step, as the computational method computes it.
+    '''
+    initial, final = velocity[:, :-1], velocity[:, 1:]
+
+    if method == "euler-cromer":
+        return final * delta_t
+    elif method == "midpoint":
+        return 0.5 * (initial + final) * delta_t
+    return initial * delta_t + 0.5 * acceleration * delta_t ** 2
+
+def exact(position: np.ndarray, velocity: np.ndarray, acceleration: np.ndarray, 
+          times: np.ndarray):
+    '''
+    * Exact position and velocity at each time. Vectors are along the last 
+    axis.
+    '''
+    position, velocity, acceleration = [np.asarray(vector, dtype = float) 
+                                        for vector in [position, velocity, acceleration]]
+    times = np.asarray(times, dtype = float)[..., None]
+    return position + velocity * times + 0.5 * acceleration * times ** 2, \
+           velocity + acceleration * times
+
+def sample_times(delta_t, max_t: float):
+    '''
+    * Time of every step for every time step of delta_t, one row per time step 
+    and NaN after the last step of a row.
+    * NOTE: 
+        - Like approximation(), times are running sums of delta_t and each run 
+        keeps stepping while its time is at most max_t, so it ends just past 
+        max_t and takes the same number of steps.
+    '''
+    delta_t = np.atleast_1d(np.asarray(delta_t, dtype = float))
+    assert np.all(delta_t > 0), "Time step cannot be zero or negative"
+
+    # A couple of spare steps, so every row ends past max_t despite rounding.
+    count = int(np.floor(max_t / delta_t.min())) + 3
+    times = np.zeros((len(delta_t), count))
+    times[:, 1:] = np.cumsum(np.broadcast_to(delta_t[:, None], (len(delta_t), count - 1)), 
+                             axis = 1)
+
+    steps = np.sum(times <= max_t, axis = 1)
+    times = np.where(np.arange(count) > steps[:, None], np.nan, times)
+    return times[:, :steps.max() + 1]
+
+def positions(method: str, position: np.ndarray, velocity: np.ndarray, 
+              acceleration: np.ndarray, delta_t: np.ndarray):
+    '''
+    * Position after every step from the velocity after every step. Steps 
+    with a NaN velocity are padding and get a NaN position.
+    '''
+    moved = displacement(method, velocity, acceleration, delta_t[:, None, None])
+    x = np.concatenate([np.broadcast_to(position, moved[:, :1].shape), 
+                        position + np.cumsum(moved, axis = 1)], axis = 1)
+
+    # Verlet only uses the velocity before a step, so pad its last step as well.
+    return np.where(np.isnan(velocity), np.nan, x)
+
+def integrate(method: str, position, velocity, acceleration, delta_t, max_t: float):
+    '''
+    * Integrate from position and velocity with every time step of delta_t at 
+    once. Returns times, positions and velocities with one row per time step 
+    and one column per step, vectors along the last axis.
+    '''
+    assert method in METHODS, f"Computational method must be one of {METHODS}"
+
+    position, velocity, acceleration = [np.atleast_1d(np.asarray(vector, dtype = float)) 
+                                        for vector in [position, velocity, acceleration]]
+    delta_t = np.atleast_1d(np.asarray(delta_t, dtype = float))
+
+    times = sample_times(delta_t, max_t)
+    _, speed = exact(position, velocity, acceleration, times)
+    return times, positions(method, position, speed, acceleration, delta_t), speed
+
+def convergence(position, velocity, acceleration, delta_t, max_t: float, 
+                methods: list = METHODS):
+    '''
+    * Largest distance between the integrated and the exact position over a 
+    run, for every method and time step. Returns one array per method with 
+    one error per time step.
+    * NOTE: 
+        - Time steps are sorted and integrated CHUNK at a time, so each chunk 
+        is only padded to a similar number of steps.
+    '''
+    for method in methods:
+        assert method in METHODS, f"Computational method must be one of {METHODS}"
+
+    position, velocity, acceleration = [np.atleast_1d(np.asarray(vector, dtype = float)) 
+                                        for vector in [position, velocity, acceleration]]
+    delta_t = np.atleast_1d(np.asarray(delta_t, dtype = float))
+    order = np.argsort(delta_t)
+    errors = {method: np.empty(len(delta_t)) for method in methods}
+
+    for chunk in np.array_split(order, -(-len(order) // CHUNK)):
+        # Every method has the same step times and exact velocity after each step.
+        times = sample_times(delta_t[chunk], max_t)
+        reference, speed = exact(position, velocity, acceleration, times)
+
+        for method in methods:
+            x = positions(method, position, speed, acceleration, delta_t[chunk])
+            errors[method][chunk] = np.nanmax(np.linalg.norm(x - reference, axis = -1), 
+                                              axis = 1)
+
+    return errors
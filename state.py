@@ -0,0 +1,83 @@
+'''
+* Struct-of-arrays representation of every particle in the simulation.
+'''
+
+import numpy as np
+
+class State:
+    def __init__(self, n_particles: int, mode: str = "1D"):
+
+        assert n_particles > 0, "State must have at least 1 particle"
+        assert mode in ["1D", "2D"], "State must be 1D or 2D"
+
+        self.n = n_particles
+        self.mode = mode
+        self.step = 0
+        self.trajectory = None
+
+        self.x = np.zeros(n_particles)
+        self.vx = np.zeros(n_particles)
+        self.y = np.zeros(n_particles)
+        self.vy = np.zeros(n_particles)
+        self.mass = np.ones(n_particles)
+        self.length = np.ones(n_particles)
+        self.width = np.ones(n_particles)
+
+    def __repr__(self):
+        return f"State({self.n}, {self.mode}, step = {self.step})"
+
+    def __len__(self):
+        return self.n
+
+    @classmethod
+    def from_particles(cls, particles: list, mode: str = "1D"):
+        '''
+        * Copy the current values of each particle into one contiguous state.
+        The particles are bound to the new state, so they become views into it.
+        '''
+        state = cls(len(particles), mode)
+
+        for index, particle in enumerate(particles):
+            state.x[index] = particle.x[-1]
+            state.vx[index] = particle.vx[-1]
+            state.y[index] = particle.y[-1]
+            state.vy[index] = particle.vy[-1]
+            state.mass[index] = particle.mass
+            state.length[index] = particle.length
+            state.width[index] = particle.width
+            particle.bind(state, index)
+
+        return state
+
+    def ke(self):
+        '''
+        * Compute the kinetic energy of every particle.
+        '''
+        return 0.5 * self.mass * (self.vx ** 2 + self.vy ** 2)
+
+    def overlap(self, i: int, j: int):
+        '''
+        * Check if particle i overlaps particle j along the x-axis, and along
+        the y-axis too in 2D.
+        '''
+        if i == j:
+            return False
+
+        overlap = self.x[i] < self.x[j] + self.length[j] and \
+            self.x[j] < self.x[i] + self.length[i]
+        if self.mode == "2D":
+            overlap = overlap and self.y[i] < self.y[j] + self.width[j] and \
+                self.y[j] < self.y[i] + self.width[i]
+        return bool(overlap)
+
+    def history(self, name: str, index: int):
+        '''
+        * Recorded values of one quantity of a particle, followed by its
+        current value if the current step has not been recorded yet.
+        '''
+        current = getattr(self, name)[index]
+
+        if self.trajectory is None:
+            return np.array([current])
+
+        return self.trajectory.history(name, index, current, self.step)
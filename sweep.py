@@ -0,0 +1,229 @@
+'''
+* Parameter sweep. Runs one headless simulation per combination of parameters
+across a process pool and writes one results table.
+* Usage: python sweep.py -p 1 1 1 3 0 -4 0 -p 2 2 1 5 6 0 0 --length 10 --time 10
+  --method euler-cromer midpoint verlet --dt 1e-2 1e-3 --friction 0.0 0.1
+  --engine step adaptive --tolerance 1e-3 1e-4
+  --workers 32 --output sweep.csv
+* NOTE:
+    - Configurations are submitted largest first by their cost, particles *
+    max_t / delta_t, so the longest runs do not end up alone at the end.
+    - The tolerance only applies to the adaptive and analytic engines, and the
+    seed only to random particles. Where they do not apply they are left
+    empty, and combinations that only differ in them run once.
+'''
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from simulation import Simulation
+from particle import Particle
+
+SYSTEM_PARAMETERS = ["system_type", "kinetic_friction", "computational_method"]
+TOLERANCE_ENGINES = ["adaptive", "analytic"]
+
+def grid(parameters: dict):
+    '''
+    * Every combination of the parameter values, e.g.
+    {"delta_t": [1e-2, 1e-3], "kinetic_friction": [0.0, 0.1]} gives 4 dicts.
+    '''
+    names = list(parameters.keys())
+    return [dict(zip(names, values))
+            for values in itertools.product(*[parameters[name] for name in names])]
+
+def applies(name: str, point: dict, simulation_info: dict):
+    '''
+    * Whether a parameter changes the run of a combination: the tolerance
+    needs an adaptive or analytic engine, the seed needs random particles.
+    '''
+    if name == "tolerance":
+        return point.get("engine", "step") in TOLERANCE_ENGINES
+    if name == "seed":
+        return len(simulation_info["particles"]) == 0
+    return True
+
+def cost(configuration: dict):
+    '''
+    * Estimated work of one run: particle steps.
+    '''
+    simulation_info = configuration["simulation_info"]
+    n = max(len(simulation_info["particles"]), simulation_info["n_particles"])
+    return n * simulation_info["max_t"] / simulation_info["delta_t"]
+
+def configurations(simulation_info: dict, system_info: dict, parameters: dict):
+    '''
+    * Build the simulation and system info of every distinct run in the sweep.
+    Each parameter can belong to either Simulation or System.
+    '''
+    runs = []
+    seen = set()
+
+    for point in grid(parameters):
+        point = {name: value if applies(name, point, simulation_info) else None
+                 for name, value in point.items()}
+        key = tuple(point.items())
+        if key in seen:
+            continue
+        seen.add(key)
+
+        run_simulation = dict(simulation_info)
+        run_system = dict(system_info)
+
+        for name, value in point.items():
+            if value is None:
+                continue
+            if name in SYSTEM_PARAMETERS:
+                run_system[name] = value
+            else:
+                run_simulation[name] = value
+
+        runs.append({"index": len(runs), "parameters": point,
+                     "simulation_info": run_simulation, "system_info": run_system})
+
+    return runs
+
+def run(configuration: dict):
+    '''
+    * Run one configuration to max_t and summarize it. Particles are given as
+    lists of length, width, mass, x, y, vx, vy so they can be sent to workers.
+    '''
+    simulation_info = dict(configuration["simulation_info"])
+    simulation_info["particles"] = [Particle(*particle)
+                                    for particle in simulation_info["particles"]]
+    simulation_info["output"] = ""
+    simulation_info["recording"] = {"final": True}
+
+    simulation = Simulation(**simulation_info, system_info = configuration["system_info"])
+    state = simulation.state
+    ke = state.ke().sum()
+    momentum = np.sum(state.mass * state.vx)
+
+    start = time.perf_counter()
+    simulation.run()
+    seconds = time.perf_counter() - start
+    drift = simulation.conservation.drift()
+
+    result = {"index": configuration["index"]}
+    result.update(configuration["parameters"])
+    result.update({
+        "particles": state.n,
+        "steps": state.step,
+        "substeps": simulation.adaptive.steps if simulation.engine in ["adaptive", "analytic"]
+                    else state.step,
+        "seconds": seconds,
+        "steps_per_second": state.step / seconds if seconds > 0 else float("inf"),
+        "ke_initial": float(ke),
+        "ke_final": float(state.ke().sum()),
+        "ke_system": float(simulation.system.ke),
+        "momentum_initial": float(momentum),
+        "momentum_final": float(np.sum(state.mass * state.vx)),
+        "energy_drift": drift["energy"],
+        "momentum_drift": drift["momentum"]
+    })
+
+    return result
+
+def sweep(simulation_info: dict, system_info: dict, parameters: dict,
+          workers: int = None, output: str = ""):
+    '''
+    * Run every configuration across a process pool. Returns the results in
+    grid order and writes them to output if given.
+    '''
+    runs = sorted(configurations(simulation_info, system_info, parameters),
+                  key = cost, reverse = True)
+    results = []
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = {executor.submit(run, configuration): configuration
+                   for configuration in runs}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"Finished {len(results)}/{len(runs)}: " + 
+                  f"{futures[future]['parameters']} in {result['seconds']:.2f}s")
+
+    results.sort(key = lambda result: result["index"])
+
+    if output != "":
+        with open(output, "w", newline = "") as file:
+            writer = csv.DictWriter(file, fieldnames = list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+
+    return results
+
+def arguments():
+    '''
+    * Command line arguments. Each grid argument takes one or more values.
+    '''
+    parser = argparse.ArgumentParser(
+        prog = "Parameter sweep",
+        description = "Compare computational methods across time steps and friction"
+    )
+
+    #Simulation info
+    parser.add_argument("-p", "--particles", nargs = "+", type = int, action = "append",
+                        default = [], help = "Configuration: length, width, mass, x, y, vx, vy")
+    parser.add_argument("--n-particles", type = int, default = 2,
+                        help = "Number of random particles if -p is not given")
+    parser.add_argument("--max-vx", type = int, default = 10,
+                        help = "Maximum velocity of random particles")
+    parser.add_argument("--seed", nargs = "+", type = int, default = [1],
+                        help = "Seeds of the random particles, one run per seed")
+    parser.add_argument("--length", type = int, required = True,
+                        help = "The boundary of the simulation")
+    parser.add_argument("--time", type = int, required = True,
+                        help = "Maximum simulation run time")
+
+    #Grid
+    parser.add_argument("--method", nargs = "+", default = ["euler-cromer", "midpoint", "verlet"],
+                        choices = ["euler-cromer", "midpoint", "verlet"])
+    parser.add_argument("--dt", nargs = "+", type = float, default = [1e-2],
+                        help = "Simulation time steps")
+    parser.add_argument("--friction", nargs = "+", type = float, default = [0.0],
+                        help = "Kinetic friction coefficients")
+    parser.add_argument("--engine", nargs = "+", default = ["step"], 
+                        choices = ["step", "event", "adaptive", "analytic"])
+    parser.add_argument("--tolerance", nargs = "+", type = float, default = [1e-3],
+                        help = "Tolerances of the adaptive and analytic engines")
+
+    parser.add_argument("--workers", type = int, default = os.cpu_count(),
+                        help = "Number of worker processes")
+    parser.add_argument("--output", type = str, default = "sweep.csv",
+                        help = "Name of the results table")
+
+    return parser.parse_args()
+
+def main():
+    parser = arguments()
+
+    simulation_info = {
+        "mode": "1D",
+        "particles": parser.particles,
+        "n_particles": len(parser.particles) or parser.n_particles,
+        "length": parser.length,
+        "width": 5,
+        "max_vx": parser.max_vx,
+        "max_vy": 0,
+        "max_t": parser.time
+    }
+    system_info = {"system_type": "elastic"}
+    parameters = {
+        "computational_method": parser.method,
+        "delta_t": parser.dt,
+        "kinetic_friction": parser.friction,
+        "engine": parser.engine,
+        "tolerance": parser.tolerance,
+        "seed": parser.seed
+    }
+
+    sweep(simulation_info, system_info, parameters, parser.workers, parser.output)
+
+if __name__ == "__main__":
+    main()
@@ -1,109 +1,239 @@
 '''
 * Object representation of the system. Includes momentum and frictional force. 
+* NOTE: 
+    - In 2D friction opposes the velocity vector, walls bound both axes, and 
+    two overlapping particles collide along the axis they overlap least on. 
 '''
 
-from particle import * 
+from state import State 
 from computation import *
 
 import numpy as np 
 
 class System:
-    def __init__(self, particles: list, system_type: str, kinetic_friction: float,
-                 computational_method: str):
+    PASSES = 100 # most rounds of collisions resolved within one step 
 
-        assert len(particles) > 0, "System must have at least 1 particle"
+    def __init__(self, state: State, system_type: str, kinetic_friction: float,
+                 computational_method: str, mode: str = "1D"):
+
+        assert len(state) > 0, "System must have at least 1 particle"
         assert system_type in ["elastic", "inelastic"], "Program only supports elastic or inelastic collision"
 
         self.system_type = system_type
-        self._ke = sum([p.ke() for p in particles])
+        self.mode = mode 
+        self._ke = state.ke().sum()
         self.acceleration = kinetic_friction * 9.8 # m/s^2
         self.computation = Computation(computational_method)
 
+        self.dissipated = 0.0 # J, work done by friction 
+        self.impulse = 0.0 # Ns, momentum given to the particles by friction and walls 
+
     def __repr__(self):
         return f"System({self.ke},{self.acceleration / 9.8})"
         
-    def __call__(self, delta_t: float, particle: Particle):
+    def __call__(self, delta_t: float, state: State):
         '''
-        * Apply kinematic equations on a particle.
+        * Apply kinematic equations on every particle.
         * Parameters:
-            - particle: An object to apply kinematic equations. 
+            - state: Positions and velocities of every particle. 
             - delta_t: Time step.  
         '''
 
-        if particle.vx[-1] < 0:
-            a_x = self.acceleration 
-        elif particle.vx[-1] > 0:
-            a_x = -1 * self.acceleration 
-        else:
-            a_x = 0 
+        if self.mode == "2D":
+            return self.__call_2d(delta_t, state)
+
+        a_x = self.friction(delta_t, state.vx)
+        x = state.x.copy()
+
+        self.ke = -1 * state.ke().sum()
+        state = self.computation(delta_t, state, a_x)
+        self.ke = state.ke().sum()
+
+        # Friction opposes the motion and never reverses it within a step. 
+        self.dissipated += np.sum(state.mass * np.abs(a_x * (state.x - x)))
+        self.impulse += np.sum(state.mass * a_x) * delta_t
+
+        return state 
+
+    def __call_2d(self, delta_t: float, state: State):
+        '''
+        * Apply kinematic equations on every particle along both axes.
+        '''
+
+        a_x, a_y = self.friction(delta_t, state.vx, state.vy)
+        x, y = state.x.copy(), state.y.copy()
+
+        self.ke = -1 * state.ke().sum()
+        state = self.computation(delta_t, state, a_x, "x")
+        state = self.computation(delta_t, state, a_y, "y")
+        self.ke = state.ke().sum()
+
+        # Friction is anti-parallel to the displacement within a step. 
+        self.dissipated += np.sum(state.mass * np.hypot(a_x, a_y) * 
+                                  np.hypot(state.x - x, state.y - y))
+        self.impulse += np.sum(state.mass * a_x) * delta_t
 
-        self.ke = -1 * particle.ke()
-        particle = self.computation(delta_t, particle, a_x)
-        self.ke = particle.ke()
+        return state 
 
-        return particle 
+    def friction(self, delta_t: float, velocity: np.ndarray, velocity_y: np.ndarray = None):
+        '''
+        * Deceleration from kinetic friction, pointing against the velocity. 
+        With velocity_y, returns both components of the deceleration against 
+        the velocity vector. 
+        * NOTE: 
+            - The magnitude is clamped so a particle that would stop within the 
+            time step comes to rest instead of reversing its velocity. 
+        '''
+
+        if velocity_y is None:
+            return -1 * np.sign(velocity) * np.minimum(self.acceleration, 
+                                                       np.abs(velocity) / delta_t)
+
+        speed = np.hypot(velocity, velocity_y)
+        magnitude = np.minimum(self.acceleration, speed / delta_t)
+        scale = np.divide(magnitude, speed, out = np.zeros_like(speed), where = speed > 0)
+
+        return -1 * scale * velocity, -1 * scale * velocity_y
         
-    def wall(self, particle: Particle, length: int, width: int):
+    def walls(self, state: State, length: int, width: int):
         '''
-        * Bounces the particle of the wall if collision is elastic, otherwise 
-        it stops. 
+        * Bounces every particle that crossed a wall back inside if collision is 
+        elastic, all at once. 
         '''
         if self.system_type == "elastic":
             #Check x-direction
-            if particle.x[-1] < 0:  
-                vox = self.__v_f(particle.x[-1], particle.vx[-1])
-                particle.x = 0
-                particle.vx = 0
-                particle.vx = vox 
-            elif particle.x[-1] > length:
-                vox = self.__v_f(particle.x[-1], particle.vx[-1])
-                particle.x = length - particle.length
-                particle.vx = 0
-                particle.vx = -1 * vox 
-            elif particle.x[-1] + particle.length > length: 
-                vox = self.__v_f(particle.x[-1] + particle.length - length, particle.vx[-1])
-                particle.x = length - particle.length 
-                particle.vx = 0
-                particle.vx = -1 * vox
-        
-            # particle.update(length, width)
+            self.impulse += self.__bounce(state, "x", length)
+            #Check y-direction
+            if self.mode == "2D":
+                self.__bounce(state, "y", width)
 
-        return particle  
-        
-    def __v_f(self, distance: float, velocity: float):
+        return state  
+
+    def __bounce(self, state: State, axis: str, boundary: float):
+        '''
+        * Bounce the particles past the walls at 0 and boundary along one axis. 
+        Returns the impulse the walls gave them. 
+        * NOTE: 
+            - A particle that went d past a wall while slowing down by a had 
+            speed sqrt(v^2 + 2ad) at the wall. It is put back at the wall and 
+            leaves with that speed, so the friction work of those d metres is 
+            given back, to the kinetic energy and out of the dissipated energy. 
         '''
-        * Compute the velocity before the particle hits the wall.
+        position, velocity = getattr(state, axis), getattr(state, "v" + axis)
+        size = state.length if axis == "x" else state.width 
+
+        left = position < 0 
+        right = position + size > boundary 
+        hit = np.flatnonzero(left | right)
+        if hit.size == 0:
+            return 0.0 
+
+        left, right = left[hit], right[hit] & ~left[hit]
+        depth = np.where(left, -1 * position[hit], position[hit] + size[hit] - boundary)
+        v, m = velocity[hit], state.mass[hit]
+        speed = np.sqrt(v ** 2 + 2 * self.__deceleration(state, axis, hit) * depth)
+        v_f = np.where(left, speed, -1 * speed)
+
+        velocity[hit] = v_f 
+        position[hit] = np.where(left, 0, boundary - size[hit])
+        returned = np.sum(0.5 * m * (speed ** 2 - v ** 2))
+        self.ke = returned
+        self.dissipated -= returned
+
+        return np.sum(m * (v_f - v))
+
+    def __deceleration(self, state: State, axis: str, index: np.ndarray):
+        '''
+        * Magnitude of the friction deceleration of some particles along one axis. 
+        '''
+        if self.mode != "2D":
+            return self.acceleration 
+
+        speed = np.hypot(state.vx[index], state.vy[index])
+        velocity = np.abs(getattr(state, "v" + axis)[index])
+        return np.divide(self.acceleration * velocity, speed, 
+                         out = np.zeros_like(speed), where = speed > 0)
+
+    def collisions(self, state: State, i: np.ndarray, j: np.ndarray):
+        '''
+        * Apply conservation of momentum on every pair of overlapping particles 
+        i[k], j[k] at once. 
         * NOTE: 
-            - If acceleration is negative then the initial velocity is also negative. 
+            - Only pairs that are still moving into each other collide, so a 
+            pair that already bounced is not bounced back while it separates. 
+            - A particle can touch several others, e.g. in a chain of blocks. 
+            Each pass resolves a set of pairs that share no particle, then the 
+            pairs are checked again, until none approaches or PASSES is reached. 
         '''
+        if self.system_type != "elastic" or len(i) == 0:
+            return state 
+
+        # Everything that does not change between passes. 
+        along_y = self.__along_y(state, i, j)
+        position = np.where(along_y, state.y[j] + 0.5 * state.width[j] - 
+                            state.y[i] - 0.5 * state.width[i], 
+                            state.x[j] + 0.5 * state.length[j] - 
+                            state.x[i] - 0.5 * state.length[i])
+        direction = np.sign(position)
+        m1, m2 = state.mass[i], state.mass[j]
+        c11, c12 = (m1 - m2) / (m1 + m2), 2 * m2 / (m1 + m2)
+        c21, c22 = 2 * m1 / (m1 + m2), (m2 - m1) / (m1 + m2)
+        priority = pair_priority(i, j)
+        
+        for _ in range(self.PASSES):
+            v1 = np.where(along_y, state.vy[i], state.vx[i])
+            v2 = np.where(along_y, state.vy[j], state.vx[j])
+            approaching = (v1 - v2) * direction > 0 
+            if not approaching.any():
+                break 
 
-        if velocity > 0:
-            acceleration = self.acceleration 
-        else:
-            acceleration = -1 * self.acceleration 
+            pairs = np.flatnonzero(approaching)
+            pairs = pairs[matching(i[pairs], j[pairs], priority[pairs], state.n)]
 
-        v_o = np.sqrt(velocity ** 2 - 2 * acceleration * distance)
+            v1, v2 = v1[pairs], v2[pairs]
+            u1 = c11[pairs] * v1 + c12[pairs] * v2 
+            u2 = c21[pairs] * v1 + c22[pairs] * v2 
 
-        return v_o 
+            y = along_y[pairs]
+            state.vx[i[pairs[~y]]], state.vx[j[pairs[~y]]] = u1[~y], u2[~y]
+            state.vy[i[pairs[y]]], state.vy[j[pairs[y]]] = u1[y], u2[y]
 
-    def momentum(self, particle_1: Particle, particle_2: Particle):
+        return state 
+
+    def momentum(self, state: State, i: int, j: int):
         '''
         * Apply conservation of momentum on two particles in collision
         '''
 
         if self.system_type == "elastic":
-            mass = particle_1.mass + particle_2.mass 
+            velocity = state.vy if self.__along_y(state, i, j) else state.vx 
+            m1, m2 = state.mass[i], state.mass[j]
+            mass = m1 + m2 
 
-            v1 = (1 / mass) * (particle_1.mass - particle_2.mass) * particle_1.vx[-1] + \
-                (1 / mass) * (2 * particle_2.mass * particle_2.vx[-1])
+            v1 = (1 / mass) * (m1 - m2) * velocity[i] + \
+                (1 / mass) * (2 * m2 * velocity[j])
             
-            v2 = (1 / mass) * (2 * particle_2.mass * particle_1.vx[-1]) + \
-                (1 / mass) * (particle_2.mass - particle_1.mass) * particle_2.vx[-1]
+            v2 = (1 / mass) * (2 * m1 * velocity[i]) + \
+                (1 / mass) * (m2 - m1) * velocity[j]
             
-            particle_1.vx = v1 
-            particle_2.vx = v2 
+            velocity[i] = v1 
+            velocity[j] = v2 
             
-        return particle_1, particle_2 
+        return state 
+
+    def __along_y(self, state: State, i, j):
+        '''
+        * Whether overlapping particles collide along y, the axis they overlap 
+        least on. Always False in 1D. Works on single pairs and arrays of pairs. 
+        '''
+        if self.mode != "2D":
+            return np.zeros(np.shape(i), dtype = bool)
+
+        overlap_x = np.minimum(state.x[i] + state.length[i], state.x[j] + state.length[j]) - \
+            np.maximum(state.x[i], state.x[j])
+        overlap_y = np.minimum(state.y[i] + state.width[i], state.y[j] + state.width[j]) - \
+            np.maximum(state.y[i], state.y[j])
+        return overlap_y < overlap_x 
 
     @property 
     def ke(self):
@@ -111,4 +241,38 @@ class System:
     
     @ke.setter 
     def ke(self, value: int):
-        self._ke += value 
\ No newline at end of file
+        self._ke += value 
+
+def pair_priority(i: np.ndarray, j: np.ndarray):
+    '''
+    * Pseudo-random but reproducible priority of each pair, so the pairs that
+    win in matching() are spread along chains instead of starting at one end.
+    '''
+    key = (i.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) ^ \
+        (j.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F))
+    key ^= key >> np.uint64(29)
+    return np.lexsort((np.arange(len(i)), key)).argsort()
+
+def matching(i: np.ndarray, j: np.ndarray, priority: np.ndarray, n_particles: int):
+    '''
+    * Indices of pairs that share no particle. A pair is taken when it has the
+    lowest priority among the pairs of both its particles. Taken pairs and
+    every pair touching them are removed, until no pair is left.
+    '''
+    taken = np.zeros(len(i), dtype = bool)
+    left = np.ones(len(i), dtype = bool)
+
+    while left.any():
+        best = np.full(n_particles, np.iinfo(priority.dtype).max)
+        np.minimum.at(best, i[left], priority[left])
+        np.minimum.at(best, j[left], priority[left])
+
+        take = left & (best[i] == priority) & (best[j] == priority)
+        taken |= take
+
+        used = np.zeros(n_particles, dtype = bool)
+        used[i[take]] = True
+        used[j[take]] = True
+        left &= ~(used[i] | used[j])
+
+    return np.flatnonzero(taken)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from diagnostics import Conservation
+from state import State
+from system import System
+
+def run(every: int = 1, last: int = None, steps: int = 1000):
+    state = State(2)
+    state.x[:] = [1, 5]
+    state.vx[:] = [1, -1]
+    system = System(state, "elastic", 0.0, "verlet")
+    conservation = Conservation(state, system, every, last)
+
+    for step in range(1, steps + 1):
+        state.step = step
+        conservation.record(step * 0.01)
+    return conservation
+
+def test_sparse_every_allocates_for_recorded_samples():
+    conservation = run(every = 100)
+
+    assert len(conservation) == 11
+    assert conservation.recording.nbytes <= 2 * len(conservation) * 5 * 8
+    assert np.allclose(conservation.time, np.arange(0, 1001, 100) * 0.01)
+
+def test_last_keeps_latest_samples_in_order():
+    conservation = run(last = 30)
+
+    assert len(conservation) == 30
+    assert np.allclose(conservation.time, np.arange(971, 1001) * 0.01)
+
+    restored = Conservation(conservation.state, conservation.system, last = 30)
+    restored.restore(conservation.snapshot())
+    assert np.array_equal(restored.time, conservation.time)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from state import State
+from system import System
+
+def moving(x: float, vx: float):
+    state = State(1)
+    state.x[:] = x
+    state.vx[:] = vx
+    return state
+
+def test_wall_bounce_with_friction_keeps_ke():
+    state = moving(8.95, 1.0)
+    system = System(state, "elastic", 0.1, "euler-cromer")
+
+    system(0.1, state)
+    system.walls(state, 10, 5)
+
+    assert state.vx[0] < 0
+    assert np.isclose(system.ke, np.sum(0.5 * state.mass * state.vx ** 2))
+
+def test_stopping_at_wall_with_friction_keeps_ke_at_zero():
+    state = moving(0.5, -1.0)
+    system = System(state, "elastic", 0.1, "euler-cromer")
+
+    for _ in range(200):
+        system(0.1, state)
+        system.walls(state, 10, 5)
+
+    assert state.vx[0] == 0
+    assert np.isclose(system.ke, 0)
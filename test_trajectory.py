@@ -0,0 +1,42 @@
+import numpy as np
+
+from state import State
+from trajectory import Trajectory
+
+def run(trajectory: Trajectory, state: State, steps: int):
+    trajectory.record(state)
+    for _ in range(steps):
+        state.step += 1
+        state.x += 1
+        trajectory.record(state)
+    trajectory.finish(state)
+
+def test_sparse_every_allocates_for_recorded_samples():
+    state = State(10)
+    trajectory = Trajectory(state.n, every = 100)
+    run(trajectory, state, 20000)
+
+    sample = 4 * state.n * 8 + 8 # four fields and the step
+    assert len(trajectory) == 201
+    assert trajectory.recording.nbytes <= 2 * len(trajectory) * sample
+    assert np.array_equal(trajectory.steps, np.arange(0, 20001, 100))
+    assert np.array_equal(trajectory.rows("x")[:, 0], np.arange(0, 20001, 100))
+
+def test_last_keeps_latest_samples_in_order():
+    state = State(3)
+    trajectory = Trajectory(state.n, last = 50)
+    run(trajectory, state, 1000)
+
+    assert len(trajectory) == 50
+    assert trajectory.recording.nbytes <= 50 * (4 * state.n * 8 + 8)
+    assert np.array_equal(trajectory.steps, np.arange(951, 1001))
+    assert np.array_equal(trajectory.history("x", 1), np.arange(951, 1001))
+
+def test_last_larger_than_run_grows_with_samples():
+    state = State(3)
+    trajectory = Trajectory(state.n, last = 10 ** 6)
+    run(trajectory, state, 100)
+
+    assert len(trajectory) == 101
+    assert trajectory.recording.nbytes <= 2 * 101 * (4 * state.n * 8 + 8)
+    assert np.array_equal(trajectory.steps, np.arange(101))
@@ -0,0 +1,151 @@
+'''
+* Recorded positions and velocities of every particle over time.
+* NOTE:
+    - The recording policy decides which steps are kept:
+        - every: Record every k-th step.
+        - last: Keep only the last N recorded steps in a ring buffer.
+        - final: Record nothing but the final state.
+    - Samples are stored in a Recording, whose blocks grow with the number of
+    recorded samples rather than the number of steps.
+    - If a sink is attached, every k-th step is streamed to it as it is 
+    recorded. With the last or final policy the kept samples are only known at 
+    the end, so they are written by finish().
+'''
+
+import numpy as np
+
+from recording import Recording
+
+class Trajectory:
+    FIELDS = ["x", "vx", "y", "vy"]
+    BLOCK = 2 ** 20 # values per field in one block
+
+    def __init__(self, n_particles: int, every: int = 1, last: int = None,
+                 final: bool = False):
+
+        assert every >= 1, "Must record at least every step"
+        assert last is None or last >= 1, "Must keep at least 1 step"
+
+        self.n = n_particles
+        self.every = every
+        self.last = last
+        self.final = final
+        self.sink = None
+
+        columns = {name: ((n_particles,), float) for name in self.FIELDS}
+        columns["step"] = ((), int)
+        max_rows = 1 if final else max(1, self.BLOCK // n_particles)
+        self.recording = Recording(columns, max_rows, last)
+
+    def __repr__(self):
+        return f"Trajectory({self.n}, every = {self.every}, last = {self.last}, " + \
+            f"final = {self.final}, samples = {len(self)})"
+
+    def __len__(self):
+        return len(self.recording)
+
+    @property
+    def count(self):
+        '''
+        * Number of samples recorded so far, kept or not.
+        '''
+        return self.recording.count
+
+    def record(self, state):
+        '''
+        * Save a copy of the current state if the policy asks for this step.
+        '''
+        if self.final or state.step % self.every != 0:
+            return
+
+        self.__append(state)
+        if self.sink is not None and self.last is None:
+            self.sink.write(state.step, *[getattr(state, name) for name in self.sink.fields])
+
+    def record_rows(self, state, steps: np.ndarray, rows: dict):
+        '''
+        * Record several steps at once. rows maps a quantity to its values, one
+        row per step. Quantities that are not given keep the state's values.
+        '''
+        if self.final:
+            return
+
+        keep = steps % self.every == 0
+        if not keep.any():
+            return
+
+        steps = steps[keep]
+        rows = {name: rows[name][keep] if name in rows else
+                np.broadcast_to(getattr(state, name), (len(steps), self.n))
+                for name in self.FIELDS}
+
+        self.__append_rows(steps, rows)
+        if self.sink is not None and self.last is None:
+            self.sink.write(steps, *[rows[name] for name in self.sink.fields])
+
+    def finish(self, state):
+        '''
+        * Save the final state when only the final state is recorded, and write
+        the kept samples to the sink if they could not be streamed.
+        '''
+        if self.final and (self.count == 0 or self.steps[-1] != state.step):
+            self.__append(state)
+
+        if self.sink is not None and (self.final or self.last is not None):
+            self.sink.write(self.steps, *[self.rows(name) for name in self.sink.fields])
+
+    def snapshot(self):
+        '''
+        * Samples needed to continue the recording after a restart. Samples
+        that were already streamed to the sink are left out.
+        '''
+        if self.sink is not None and self.last is None:
+            steps = np.empty(0, dtype = int)
+            return {"steps": steps, **{name: np.empty((0, self.n)) for name in self.FIELDS}}
+
+        return {"steps": self.steps, **{name: self.rows(name) for name in self.FIELDS}}
+
+    def restore(self, snapshot: dict):
+        '''
+        * Refill the recording from snapshot().
+        '''
+        self.recording.clear()
+        self.__append_rows(snapshot["steps"], snapshot)
+
+    @property
+    def steps(self):
+        '''
+        * The step of each recorded sample.
+        '''
+        return self.recording.ordered("step")
+
+    def rows(self, name: str):
+        '''
+        * Recorded values of one quantity, one row per sample and one column
+        per particle.
+        '''
+        return self.recording.ordered(name)
+
+    def history(self, name: str, index: int, current: float = None, step: int = None):
+        '''
+        * Recorded values of one quantity for a single particle. The current
+        value is appended when it belongs to a step that was not recorded.
+        '''
+        values = self.recording.ordered(name, index)
+        steps = self.steps
+        if current is not None and (len(steps) == 0 or steps[-1] != step):
+            values = np.append(values, current)
+        return values
+
+    def __append(self, state):
+        '''
+        * Copy the state into the next free row.
+        '''
+        self.__append_rows(np.array([state.step]),
+                           {name: getattr(state, name)[None] for name in self.FIELDS})
+
+    def __append_rows(self, steps: np.ndarray, rows: dict):
+        '''
+        * Copy rows into the next free rows.
+        '''
+        self.recording.append({"step": steps, **{name: rows[name] for name in self.FIELDS}})